@@ -4,20 +4,21 @@ EdgePulse-Pi5 - Real-time Health Monitoring System
 Main Application Entry Point
 """
 
-import argparse
+import os
 import sys
+import copy
 import signal
 import time
 import logging
+import queue
+import threading
 from pathlib import Path
 from datetime import datetime, timedelta
-import yaml
 
 from src.sensors import SensorManager
 from src.analyzer import VitalSignsAnalyzer
 from src.alerts import AlertManager
 from src.data_handler import DataHandler
-from src.web_dashboard import create_app
 
 # Setup logging
 logging.basicConfig(
@@ -30,6 +31,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Parsed configuration files keyed by (path, mtime_ns, size)
+_CONFIG_CACHE = {}
+
 
 class EdgePulseMonitor:
     """Main monitoring system controller"""
@@ -43,11 +47,24 @@ class EdgePulseMonitor:
         logger.info("Initializing EdgePulse-Pi5 monitoring system...")
         
         try:
-            self.data_handler = DataHandler(self.config['database']['path'])
+            db_config = self.config['database']
+            self.data_handler = DataHandler(
+                db_config['path'],
+                batch_size=db_config.get('batch_size', 32),
+                flush_interval=db_config.get('flush_interval', 5)
+            )
             self.sensor_manager = SensorManager(self.config['sensors'])
             self.analyzer = VitalSignsAnalyzer(self.config['thresholds'])
             self.alert_manager = AlertManager(self.config['alerts'])
             
+            # Persistence and alerting run off the sensor thread
+            self._work_q = queue.Queue(maxsize=256)
+            self._worker = threading.Thread(
+                target=self._worker_loop,
+                name='edgepulse-worker',
+                daemon=True
+            )
+            
             logger.info("System initialization complete")
             
         except Exception as e:
@@ -56,11 +73,26 @@ class EdgePulseMonitor:
     
     def load_config(self, config_path):
         """Load configuration from YAML file"""
+        import yaml
+        
+        # libyaml's C loader parses several times faster when available
+        try:
+            from yaml import CSafeLoader as _Loader
+        except ImportError:
+            from yaml import SafeLoader as _Loader
+        
         try:
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            logger.info(f"Configuration loaded from {config_path}")
-            return config
+            # Reuse the parsed file while its mtime/size are unchanged
+            st = os.stat(config_path)
+            key = (os.path.abspath(config_path), st.st_mtime_ns, st.st_size)
+            
+            if key not in _CONFIG_CACHE:
+                with open(config_path, 'r') as f:
+                    _CONFIG_CACHE[key] = yaml.load(f, Loader=_Loader)
+                logger.info(f"Configuration loaded from {config_path}")
+            
+            # Hand out a copy so callers can't mutate the cached dict
+            return copy.deepcopy(_CONFIG_CACHE[key])
         except FileNotFoundError:
             logger.error(f"Configuration file not found: {config_path}")
             sys.exit(1)
@@ -86,6 +118,11 @@ class EdgePulseMonitor:
         consecutive_errors = 0
         max_consecutive_errors = 5
         
+        self._worker.start()
+        
+        # Drift-free schedule on the monotonic clock (immune to NTP steps)
+        next_tick = time.monotonic()
+        
         try:
             while self.running:
                 try:
@@ -93,52 +130,99 @@ class EdgePulseMonitor:
                     readings = self.sensor_manager.read_all()
                     
                     if readings:
-                        # Log readings
-                        logger.debug(f"Readings: HR={readings.get('heart_rate')}bpm, "
-                                   f"SpO2={readings.get('spo2')}%, "
-                                   f"Temp={readings.get('temperature')}°C")
-                        
-                        # Store in database
-                        self.data_handler.save_reading(readings)
-                        
-                        # Analyze for abnormalities
-                        alerts = self.analyzer.analyze(readings)
+                        # Log readings (skip argument lookups unless DEBUG is on)
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Readings: HR=%sbpm, SpO2=%s%%, Temp=%s°C",
+                                         readings.get('heart_rate'),
+                                         readings.get('spo2'),
+                                         readings.get('temperature'))
                         
-                        # Handle any alerts
-                        if alerts:
-                            for alert in alerts:
-                                logger.warning(f"Alert: {alert['message']}")
-                                self.alert_manager.send_alert(alert)
-                                self.data_handler.save_alert(alert)
+                        # Hand off storage, analysis and alerting to the worker
+                        self._submit('reading', readings)
                         
                         # Reset error counter on successful reading
                         consecutive_errors = 0
                     
                     else:
                         consecutive_errors += 1
-                        logger.warning(f"Failed to read sensors ({consecutive_errors}/{max_consecutive_errors})")
+                        logger.warning("Failed to read sensors (%d/%d)",
+                                       consecutive_errors, max_consecutive_errors)
                         
                         if consecutive_errors >= max_consecutive_errors:
                             error_alert = {
                                 'type': 'system_error',
                                 'severity': 'critical',
                                 'message': 'Sensor communication failure - multiple consecutive errors',
-                                'timestamp': datetime.now()
+                                'timestamp': time.time_ns()
                             }
-                            self.alert_manager.send_alert(error_alert)
+                            self._submit('alert', error_alert)
                             consecutive_errors = 0  # Reset to avoid spam
-                    
-                    # Wait for next measurement
-                    time.sleep(measurement_interval)
                 
                 except Exception as e:
                     logger.error(f"Error in monitoring loop: {e}", exc_info=True)
                     consecutive_errors += 1
-                    time.sleep(measurement_interval)
+                
+                # Wait for next measurement
+                next_tick = self._wait_for_next_tick(next_tick, measurement_interval)
         
         finally:
             self.cleanup()
     
+    def _submit(self, kind, payload):
+        """Queue work for the background worker without blocking"""
+        try:
+            self._work_q.put_nowait((kind, payload))
+        except queue.Full:
+            # Drop the oldest item so the most recent data is kept
+            try:
+                self._work_q.get_nowait()
+            except queue.Empty:
+                pass
+            logger.warning("Work queue full, dropped oldest item")
+            self._work_q.put_nowait((kind, payload))
+    
+    def _worker_loop(self):
+        """Drain the work queue: store readings, analyze, dispatch alerts"""
+        while True:
+            item = self._work_q.get()
+            if item is None:
+                break
+            
+            kind, payload = item
+            try:
+                if kind == 'reading':
+                    # Store in database (buffered, one transaction per batch)
+                    self.data_handler.save_reading(payload)
+                    
+                    # Analyze for abnormalities
+                    alerts = self.analyzer.analyze(payload)
+                    
+                    # Handle any alerts; the alert manager's cooldown only
+                    # throttles notifications, every alert is still stored
+                    for alert in alerts:
+                        logger.warning("Alert: %s", alert['message'])
+                        self.alert_manager.send_alert(alert)
+                        self.data_handler.save_alert(alert)
+                
+                elif kind == 'alert':
+                    self.alert_manager.send_alert(payload)
+            
+            except Exception as e:
+                logger.error(f"Error in worker loop: {e}", exc_info=True)
+    
+    def _wait_for_next_tick(self, next_tick, interval):
+        """Sleep until the next scheduled tick and return its monotonic time"""
+        next_tick += interval
+        sleep_for = next_tick - time.monotonic()
+        
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+            return next_tick
+        
+        # Overran the interval; restart the schedule from now instead of
+        # firing a burst of catch-up readings
+        return time.monotonic()
+    
     def stop(self):
         """Stop the monitoring system"""
         logger.info("Stopping monitoring system...")
@@ -148,7 +232,13 @@ class EdgePulseMonitor:
         """Cleanup resources"""
         logger.info("Cleaning up resources...")
         try:
+            if self._worker.is_alive():
+                # Let queued work finish before closing the database
+                self._work_q.put(None)
+                self._worker.join(timeout=30)
+            
             self.sensor_manager.cleanup()
+            self.alert_manager.close()
             self.data_handler.close()
             logger.info("Cleanup complete")
         except Exception as e:
@@ -198,24 +288,40 @@ class EdgePulseMonitor:
         """Test alert system"""
         logger.info("Testing alert system...")
         
+        # Critical alerts are routed to every channel, so each configured
+        # channel gets exercised
         test_alert = {
             'type': 'test',
-            'severity': 'info',
+            'severity': 'critical',
             'message': 'This is a test alert from EdgePulse-Pi5',
-            'timestamp': datetime.now()
+            'timestamp': time.time_ns()
         }
         
         try:
-            self.alert_manager.send_alert(test_alert)
-            logger.info("Test alert sent successfully")
+            results = self.alert_manager.send_alert(test_alert)
+            if results.get('skipped'):
+                logger.warning("No alert channels are enabled, test alert not sent")
+                return False
+            if results.get('suppressed'):
+                logger.warning("Test alert suppressed by the alert cooldown")
+                return False
+            
+            sent_channels = [ch for ch, success in results.items() if success]
+            if not sent_channels:
+                logger.error("Test alert was not sent through any channel")
+                return False
+            
+            logger.info("Test alert sent via: %s", ', '.join(sent_channels))
             return True
         except Exception as e:
             logger.error(f"Failed to send test alert: {e}")
             return False
 
 
-def main():
-    """Main entry point"""
+def _build_parser():
+    """Build the command-line argument parser"""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description='EdgePulse-Pi5 - Real-time Health Monitoring System'
     )
@@ -297,18 +403,42 @@ def main():
         help='Validate configuration and exit'
     )
     
-    args = parser.parse_args()
+    return parser
+
+
+def _init_monitor(config_path):
+    """Create the monitor or exit on failure"""
+    try:
+        return EdgePulseMonitor(config_path)
+    except Exception as e:
+        logger.error(f"Failed to initialize monitor: {e}")
+        sys.exit(1)
+
+
+def _run_monitor(monitor):
+    """Start normal monitoring"""
+    logger.info("=" * 50)
+    logger.info("EdgePulse-Pi5 - Real-time Health Monitoring System")
+    logger.info("=" * 50)
+    monitor.start()
+
+
+def main():
+    """Main entry point"""
+    # Fast path: plain `python main.py` starts monitoring without building
+    # the full argparse spec
+    if len(sys.argv) == 1:
+        _run_monitor(_init_monitor('config.yaml'))
+        return
+    
+    args = _build_parser().parse_args()
     
     # Set logging level
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
     # Initialize monitor
-    try:
-        monitor = EdgePulseMonitor(args.config)
-    except Exception as e:
-        logger.error(f"Failed to initialize monitor: {e}")
-        sys.exit(1)
+    monitor = _init_monitor(args.config)
     
     # Handle commands
     if args.validate_config:
@@ -350,17 +480,16 @@ def main():
         sys.exit(0)
     
     elif args.web:
-        # Start web dashboard only
+        # Start web dashboard only (Flask is only imported for this mode)
+        from src.web_dashboard import create_app, run
+        
         app = create_app(monitor)
         logger.info(f"Starting web dashboard on port {args.port}")
-        app.run(host='0.0.0.0', port=args.port, debug=args.verbose)
+        threads = monitor.config.get('web_dashboard', {}).get('threads', 8)
+        run(app, '0.0.0.0', args.port, threads=threads, debug=args.verbose)
     
     else:
-        # Start normal monitoring
-        logger.info("=" * 50)
-        logger.info("EdgePulse-Pi5 - Real-time Health Monitoring System")
-        logger.info("=" * 50)
-        monitor.start()
+        _run_monitor(monitor)
 
 
 if __name__ == '__main__':
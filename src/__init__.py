@@ -6,14 +6,36 @@ Real-time Health Monitoring System
 __version__ = '1.0.0'
 __author__ = 'EdgePulse Team'
 
-from .sensors import SensorManager
-from .analyzer import VitalSignsAnalyzer
-from .alerts import AlertManager
-from .data_handler import DataHandler
+import importlib
+
+# Public classes are imported on first access (PEP 562) so that importing
+# one submodule does not pull in every hardware/network library
+_LAZY_EXPORTS = {
+    'SensorManager': '.sensors',
+    'VitalSignsAnalyzer': '.analyzer',
+    'Limits': '.analyzer',
+    'AlertManager': '.alerts',
+    'DataHandler': '.data_handler'
+}
 
 __all__ = [
     'SensorManager',
     'VitalSignsAnalyzer',
+    'Limits',
     'AlertManager',
     'DataHandler'
 ]
+
+
+def __getattr__(name):
+    """Import public classes lazily"""
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -5,19 +5,107 @@ Handles multi-channel notifications (Email, SMS, Local alerts)
 
 import logging
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import string
+import collections
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from email.message import EmailMessage
 from typing import Dict, Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-try:
-    from twilio.rest import Client as TwilioClient
-    HAS_TWILIO = True
-except ImportError:
-    logger.warning("Twilio library not available, SMS alerts disabled")
-    HAS_TWILIO = False
+
+# Email body templates (static parts are built once at import time)
+_TEXT_TEMPLATE = string.Template("""
+EdgePulse-Pi5 Health Monitoring Alert
+
+SEVERITY: $severity_upper
+TYPE: $type
+TIME: $timestamp
+
+MESSAGE:
+$message
+$extras
+
+---
+This is an automated message from EdgePulse-Pi5 monitoring system.""")
+
+_HTML_TEMPLATE = string.Template("""
+        <html>
+        <head>
+            <style>
+                body { font-family: Arial, sans-serif; }
+                .alert-box {
+                    border-left: 5px solid $color;
+                    padding: 15px;
+                    background-color: #f8f9fa;
+                    margin: 20px 0;
+                }
+                .severity { 
+                    color: $color;
+                    font-weight: bold;
+                    font-size: 18px;
+                }
+                .message {
+                    font-size: 16px;
+                    margin: 10px 0;
+                }
+                .details {
+                    color: #6c757d;
+                    font-size: 14px;
+                }
+            </style>
+        </head>
+        <body>
+            <h2>🏥 EdgePulse-Pi5 Health Monitoring Alert</h2>
+            <div class="alert-box">
+                <div class="severity">$severity_upper ALERT</div>
+                <div class="details">Type: $type | Time: $timestamp</div>
+                <div class="message">$message</div>
+        $extras
+            </div>
+            <p style="color: #6c757d; font-size: 12px;">
+                This is an automated message from EdgePulse-Pi5 monitoring system.
+            </p>
+        </body>
+        </html>
+        """)
+
+# Email accent color based on severity
+_SEVERITY_COLORS = {
+    'critical': '#dc3545',
+    'warning': '#ffc107',
+    'info': '#17a2b8'
+}
+
+# SMS header per severity ("<emoji> EdgePulse Alert\nSEVERITY: ")
+_SMS_PREFIXES = {
+    severity: f"{emoji} EdgePulse Alert\n{severity.upper()}: "
+    for severity, emoji in (
+        ('critical', '🚨'),
+        ('warning', '⚠️'),
+        ('info', 'ℹ️')
+    )
+}
+
+
+def _format_timestamp(alert: Dict) -> str:
+    """
+    Format an alert timestamp as 'YYYY-MM-DD HH:MM:SS'
+    
+    Accepts a datetime or an integer from time.time_ns(); the latter is
+    only converted to a datetime here, when an alert is actually rendered.
+    """
+    # Only fall back to now() when the alert has no timestamp; a dict.get()
+    # default would be evaluated on every call
+    ts = alert.get('timestamp')
+    if ts is None:
+        ts = datetime.now()
+    elif isinstance(ts, int):
+        ts = datetime.fromtimestamp(ts / 1e9)
+    return ts.isoformat(' ', 'seconds')
 
 
 class EmailAlert:
@@ -36,6 +124,16 @@ class EmailAlert:
             self.recipient = config.get('recipient')
             self.from_addr = config.get('from_address', self.username)
             
+            # Send an HTML alternative part (set false for text-only inboxes)
+            self.html_enabled = config.get('html', True)
+            
+            # Implicit TLS (port 465) skips the EHLO/STARTTLS/EHLO round trip
+            self.use_ssl = config.get('use_ssl', self.smtp_port == 465)
+            
+            # Persistent SMTP session, reused across alerts
+            self._smtp = None
+            self._lock = threading.Lock()
+            
             logger.info("Email alerts enabled")
         else:
             logger.info("Email alerts disabled")
@@ -47,118 +145,106 @@ class EmailAlert:
         
         try:
             # Create message
-            msg = MIMEMultipart('alternative')
+            msg = EmailMessage()
             msg['Subject'] = f"EdgePulse Alert: {alert['severity'].upper()} - {alert['type']}"
             msg['From'] = self.from_addr
             msg['To'] = self.recipient
             
-            # Create email body
-            text_body = self._create_text_body(alert)
-            html_body = self._create_html_body(alert)
-            
-            msg.attach(MIMEText(text_body, 'plain'))
-            msg.attach(MIMEText(html_body, 'html'))
+            # Create email body (plain text, plus HTML unless disabled or the
+            # alert is only informational)
+            msg.set_content(self._create_text_body(alert))
+            if self.html_enabled and alert['severity'] != 'info':
+                msg.add_alternative(self._create_html_body(alert), subtype='html')
             
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.username, self.password)
-                server.send_message(msg)
+            # Send email over the cached connection
+            with self._lock:
+                try:
+                    self._get_conn().send_message(msg)
+                except (smtplib.SMTPException, OSError):
+                    self._smtp = None
+                    raise
             
-            logger.info(f"Email alert sent to {self.recipient}")
+            logger.info("Email alert sent to %s", self.recipient)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to send email alert: {e}")
+            logger.error("Failed to send email alert: %s", e)
             return False
     
+    def _get_conn(self) -> smtplib.SMTP:
+        """
+        Return a live SMTP connection, reconnecting only when needed
+        
+        Must be called with self._lock held.
+        """
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+                return self._smtp
+            except (smtplib.SMTPException, OSError):
+                logger.debug("SMTP connection lost, reconnecting")
+                self._smtp = None
+        
+        if self.use_ssl:
+            conn = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port)
+        else:
+            conn = smtplib.SMTP(self.smtp_server, self.smtp_port)
+            conn.starttls()
+        conn.login(self.username, self.password)
+        self._smtp = conn
+        return conn
+    
+    def close(self):
+        """Close the cached SMTP connection"""
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            if self._smtp is not None:
+                try:
+                    self._smtp.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+                self._smtp = None
+    
     def _create_text_body(self, alert: Dict) -> str:
         """Create plain text email body"""
-        timestamp = alert.get('timestamp', datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
-        
-        body = f"""
-EdgePulse-Pi5 Health Monitoring Alert
-
-SEVERITY: {alert['severity'].upper()}
-TYPE: {alert['type']}
-TIME: {timestamp}
-
-MESSAGE:
-{alert['message']}
-"""
+        timestamp = _format_timestamp(alert)
         
+        extras = ''
         if 'value' in alert:
-            body += f"\nCurrent Value: {alert['value']}"
+            extras += f"\nCurrent Value: {alert['value']}"
         
         if 'threshold' in alert:
-            body += f"\nThreshold: {alert['threshold']}"
+            extras += f"\nThreshold: {alert['threshold']}"
         
-        body += "\n\n---\nThis is an automated message from EdgePulse-Pi5 monitoring system."
-        
-        return body
+        return _TEXT_TEMPLATE.substitute(
+            severity_upper=alert['severity'].upper(),
+            type=alert['type'],
+            timestamp=timestamp,
+            message=alert['message'],
+            extras=extras
+        )
     
     def _create_html_body(self, alert: Dict) -> str:
         """Create HTML email body"""
-        timestamp = alert.get('timestamp', datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Color based on severity
-        severity_colors = {
-            'critical': '#dc3545',
-            'warning': '#ffc107',
-            'info': '#17a2b8'
-        }
-        color = severity_colors.get(alert['severity'], '#6c757d')
-        
-        html = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; }}
-                .alert-box {{
-                    border-left: 5px solid {color};
-                    padding: 15px;
-                    background-color: #f8f9fa;
-                    margin: 20px 0;
-                }}
-                .severity {{ 
-                    color: {color};
-                    font-weight: bold;
-                    font-size: 18px;
-                }}
-                .message {{
-                    font-size: 16px;
-                    margin: 10px 0;
-                }}
-                .details {{
-                    color: #6c757d;
-                    font-size: 14px;
-                }}
-            </style>
-        </head>
-        <body>
-            <h2>🏥 EdgePulse-Pi5 Health Monitoring Alert</h2>
-            <div class="alert-box">
-                <div class="severity">{alert['severity'].upper()} ALERT</div>
-                <div class="details">Type: {alert['type']} | Time: {timestamp}</div>
-                <div class="message">{alert['message']}</div>
-        """
+        timestamp = _format_timestamp(alert)
         
+        extras = ''
         if 'value' in alert:
-            html += f"<div class='details'>Current Value: <strong>{alert['value']}</strong></div>"
+            extras += f"<div class='details'>Current Value: <strong>{alert['value']}</strong></div>"
         
         if 'threshold' in alert:
-            html += f"<div class='details'>Threshold: {alert['threshold']}</div>"
+            extras += f"<div class='details'>Threshold: {alert['threshold']}</div>"
         
-        html += """
-            </div>
-            <p style="color: #6c757d; font-size: 12px;">
-                This is an automated message from EdgePulse-Pi5 monitoring system.
-            </p>
-        </body>
-        </html>
-        """
-        
-        return html
+        return _HTML_TEMPLATE.substitute(
+            color=_SEVERITY_COLORS.get(alert['severity'], '#6c757d'),
+            severity_upper=alert['severity'].upper(),
+            type=alert['type'],
+            timestamp=timestamp,
+            message=alert['message'],
+            extras=extras
+        )
 
 
 class SMSAlert:
@@ -167,12 +253,20 @@ class SMSAlert:
     def __init__(self, config: Dict):
         """Initialize SMS alert system"""
         self.config = config
-        self.enabled = config.get('enabled', False) and HAS_TWILIO
+        self.enabled = config.get('enabled', False)
         
         if self.enabled:
             provider = config.get('provider', 'twilio')
             
             if provider == 'twilio':
+                # Imported here so Twilio is only loaded when SMS is enabled
+                try:
+                    from twilio.rest import Client as TwilioClient
+                except ImportError:
+                    logger.warning("Twilio library not available, SMS alerts disabled")
+                    self.enabled = False
+                    return
+                
                 self.account_sid = config.get('account_sid')
                 self.auth_token = config.get('auth_token')
                 self.from_number = config.get('from_number')
@@ -182,10 +276,10 @@ class SMSAlert:
                     self.client = TwilioClient(self.account_sid, self.auth_token)
                     logger.info("SMS alerts enabled (Twilio)")
                 except Exception as e:
-                    logger.error(f"Failed to initialize Twilio: {e}")
+                    logger.error("Failed to initialize Twilio: %s", e)
                     self.enabled = False
             else:
-                logger.warning(f"Unknown SMS provider: {provider}")
+                logger.warning("Unknown SMS provider: %s", provider)
                 self.enabled = False
         else:
             logger.info("SMS alerts disabled")
@@ -206,27 +300,24 @@ class SMSAlert:
                 to=self.to_number
             )
             
-            logger.info(f"SMS alert sent to {self.to_number}")
+            logger.info("SMS alert sent to %s", self.to_number)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to send SMS alert: {e}")
+            logger.error("Failed to send SMS alert: %s", e)
             return False
     
     def _create_sms_message(self, alert: Dict) -> str:
         """Create SMS message text"""
-        severity_emoji = {
-            'critical': '🚨',
-            'warning': '⚠️',
-            'info': 'ℹ️'
-        }
-        emoji = severity_emoji.get(alert['severity'], '📢')
-        
-        message = f"{emoji} EdgePulse Alert\n"
-        message += f"{alert['severity'].upper()}: {alert['message']}"
+        severity = alert['severity']
+        prefix = _SMS_PREFIXES.get(severity)
+        if prefix is None:
+            prefix = f"📢 EdgePulse Alert\n{severity.upper()}: "
         
         if 'value' in alert:
-            message += f"\nValue: {alert['value']}"
+            message = f"{prefix}{alert['message']}\nValue: {alert['value']}"
+        else:
+            message = f"{prefix}{alert['message']}"
         
         return message[:160]  # SMS length limit
 
@@ -240,8 +331,9 @@ class LocalAlert:
         self.buzzer_enabled = config.get('buzzer_enabled', True)
         self.led_enabled = config.get('led_enabled', True)
         self.indicators = indicators
+        self.enabled = indicators is not None
         
-        logger.info(f"Local alerts - Buzzer: {self.buzzer_enabled}, LED: {self.led_enabled}")
+        logger.info("Local alerts - Buzzer: %s, LED: %s", self.buzzer_enabled, self.led_enabled)
     
     def send(self, alert: Dict) -> bool:
         """Trigger local alert"""
@@ -272,11 +364,11 @@ class LocalAlert:
                 duration, count = beep_patterns.get(severity, (0.1, 1))
                 self.indicators.beep(duration=duration, count=count)
             
-            logger.info(f"Local alert triggered: {severity}")
+            logger.info("Local alert triggered: %s", severity)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to trigger local alert: {e}")
+            logger.error("Failed to trigger local alert: %s", e)
             return False
 
 
@@ -292,20 +384,76 @@ class AlertManager:
         self.sms_alert = SMSAlert(config.get('sms', {}))
         self.local_alert = LocalAlert(config.get('local', {}), indicators)
         
+        # Channels used for each severity: all channels for critical alerts,
+        # email and local for warnings, local only for info (the fallback
+        # for unknown severities)
+        self._routes = {
+            'critical': (
+                ('email', self.email_alert),
+                ('sms', self.sms_alert),
+                ('local', self.local_alert)
+            ),
+            'warning': (
+                ('email', self.email_alert),
+                ('local', self.local_alert)
+            ),
+            'info': (
+                ('local', self.local_alert),
+            )
+        }
+        
         # Alert history
-        self.alert_history = []
         self.max_history = 1000
+        self.alert_history = collections.deque(maxlen=self.max_history)
+        
+        # Worker pool for parallel channel dispatch (one thread per channel)
+        self.send_timeout = config.get('send_timeout', 10)
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='alert')
+        
+        # Severities whose routes have no usable channel are not dispatched
+        self._severity_enabled = {
+            severity: any(handler.enabled for _, handler in channels)
+            for severity, channels in self._routes.items()
+        }
+        
+        # Per-(type, severity) rate limiting to avoid SMTP/SMS storms
+        self._cooldown = config.get('cooldown', 300)
+        self._last_sent = {}
+        self._suppressed = {}
         
         logger.info("Alert manager initialized")
     
     def send_alert(self, alert: Dict):
         """Send alert through all enabled channels"""
-        logger.info(f"Processing alert: {alert['type']} ({alert['severity']})")
+        severity = alert['severity']
+        
+        # Nothing to dispatch: just record the alert
+        if not self._severity_enabled.get(severity, self._severity_enabled['info']):
+            self.alert_history.append(alert)
+            logger.debug("No channels enabled for %s alerts, skipping dispatch", severity)
+            return {'skipped': True}
+        
+        # Suppress repeats of the same alert within the cooldown window
+        key = (alert['type'], severity)
+        now = time.monotonic()
         
-        # Add to history
+        if now - self._last_sent.get(key, float('-inf')) < self._cooldown:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            logger.debug("Alert suppressed by cooldown: %s (%s)", alert['type'], alert['severity'])
+            return {'suppressed': True}
+        
+        self._last_sent[key] = now
+        suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            alert = {
+                **alert,
+                'message': f"{alert['message']} ({suppressed} similar alert(s) suppressed)"
+            }
+        
+        logger.info("Processing alert: %s (%s)", alert['type'], alert['severity'])
+        
+        # Add to history (bounded deque evicts the oldest entry)
         self.alert_history.append(alert)
-        if len(self.alert_history) > self.max_history:
-            self.alert_history.pop(0)
         
         # Send through each channel
         results = {
@@ -315,27 +463,28 @@ class AlertManager:
         }
         
         # Determine which channels to use based on severity
-        severity = alert['severity']
+        channels = self._routes.get(severity, self._routes['info'])
         
-        if severity == 'critical':
-            # Send through all channels for critical alerts
-            results['email'] = self.email_alert.send(alert)
-            results['sms'] = self.sms_alert.send(alert)
-            results['local'] = self.local_alert.send(alert)
-        
-        elif severity == 'warning':
-            # Email and local for warnings
-            results['email'] = self.email_alert.send(alert)
-            results['local'] = self.local_alert.send(alert)
+        # Dispatch channels concurrently so total latency is the slowest
+        # channel rather than the sum of SMTP + Twilio + buzzer time
+        futures = {
+            name: self._executor.submit(handler.send, alert)
+            for name, handler in channels
+        }
         
-        else:  # info
-            # Local only for info
-            results['local'] = self.local_alert.send(alert)
+        deadline = time.monotonic() + self.send_timeout
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except FuturesTimeoutError:
+                logger.error("Timed out sending %s alert", name)
+            except Exception as e:
+                logger.error("Failed to send %s alert: %s", name, e)
         
         # Log results
         sent_channels = [ch for ch, success in results.items() if success]
         if sent_channels:
-            logger.info(f"Alert sent via: {', '.join(sent_channels)}")
+            logger.info("Alert sent via: %s", ', '.join(sent_channels))
         else:
             logger.warning("Alert not sent through any channel")
         
@@ -343,12 +492,18 @@ class AlertManager:
     
     def get_alert_history(self, count: int = 10) -> list:
         """Get recent alert history"""
-        return self.alert_history[-count:]
+        return list(self.alert_history)[-count:]
     
     def clear_history(self):
         """Clear alert history"""
         self.alert_history.clear()
         logger.info("Alert history cleared")
+    
+    def close(self):
+        """Shut down the channel dispatch pool and open connections"""
+        self._executor.shutdown(wait=False)
+        self.email_alert.close()
+        logger.info("Alert manager closed")
 
 
 if __name__ == '__main__':
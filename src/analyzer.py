@@ -3,32 +3,311 @@ Vital Signs Analyzer Module
 Detects abnormal patterns and generates alerts
 """
 
+import time
 import logging
-from typing import Dict, List, Optional
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Union
 from datetime import datetime
-from collections import deque
 
 logger = logging.getLogger(__name__)
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        """Fallback that leaves the function as plain Python"""
+        def decorator(func):
+            return func
+        return decorator
+
+# Number of readings in each of the two windows compared by trend analysis
+TREND_WINDOW = 5
+
+# Trend bits returned in the last slot of _check_vitals
+TREND_HR_RISE = 1
+TREND_SPO2_DECLINE = 2
+TREND_TEMP_RISE = 4
+
+_NAN = float('nan')
+_INF = float('inf')
+
+
+@dataclass(frozen=True)
+class Limits:
+    """
+    Alert limits for one vital sign
+    
+    Unset limits are None (SpO2 has no upper limits). __slots__ is spelled
+    out because dataclass(slots=True) needs Python 3.10, and so is the
+    pickle state it would add: the default restores slots with setattr,
+    which a frozen dataclass refuses.
+    """
+    __slots__ = ('min', 'max', 'critical_min', 'critical_max')
+    
+    min: Optional[float]
+    max: Optional[float]
+    critical_min: Optional[float]
+    critical_max: Optional[float]
+    
+    def __getstate__(self):
+        return (self.min, self.max, self.critical_min, self.critical_max)
+    
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+    
+    @classmethod
+    def from_config(cls, config: Union[Mapping, 'Limits']) -> 'Limits':
+        """Build from a thresholds config section; Limits pass through unchanged"""
+        if isinstance(config, cls):
+            return config
+        return cls(
+            config.get('min'),
+            config.get('max'),
+            config.get('critical_min'),
+            config.get('critical_max')
+        )
+
+
+def _limit(value: Optional[float], default: float) -> float:
+    """Configured limit, or the default when it isn't set"""
+    return default if value is None else value
+
+
+def _band_scalar(value, limits) -> int:
+    """
+    _band for one Python number, used when Numba isn't installed
+    
+    Interpreted, the kernel's two searchsorted calls cost several times
+    more than these comparisons. None is a missing value (0).
+    """
+    if value is None:
+        return 0
+    critical_min, low, high, critical_max = limits
+    if value < critical_min:
+        return -2
+    if value > critical_max:
+        return 2
+    if value < low:
+        return -1
+    if value > high:
+        return 1
+    return 0
+
+@njit(cache=True)
+def _band(value, limits):
+    """
+    Classify a value against its sorted limits without an if/elif cascade
+    
+    Lower limits are exclusive (side='right') and upper limits inclusive
+    (side='left'), so the result is -2/2 for critical, -1/1 for warning
+    and 0 for normal or a missing (NaN) value.
+    """
+    if value != value:
+        return 0
+    return (np.searchsorted(limits[:2], value, side='right')
+            + np.searchsorted(limits[2:], value, side='left') - 2)
+
+
+@njit(cache=True)
+def _check_vitals(vitals, limits):
+    """
+    Numeric core of the threshold and trend checks
+    
+    Args:
+        vitals: float64 array of heart rate, SpO2, temperature (°C) and the
+            three trend deltas; NaN marks a missing value
+        limits: (3, 4) float64 array of critical_min, min, max, critical_max
+            per vital, each row sorted ascending
+        
+    Returns:
+        int8 array of the heart rate, SpO2 and temperature codes followed by
+        a bitmask of fired trend alerts
+    """
+    codes = np.zeros(4, dtype=np.int8)
+    for i in range(3):
+        codes[i] = _band(vitals[i], limits[i])
+    
+    trend = 0
+    if vitals[3] > 20:  # Increase of >20 bpm in short time
+        trend |= TREND_HR_RISE
+    if vitals[4] < -3:  # Decrease of >3% in short time
+        trend |= TREND_SPO2_DECLINE
+    if vitals[5] > 0.5:  # Increase of >0.5°C in short time
+        trend |= TREND_TEMP_RISE
+    codes[3] = trend
+    
+    return codes
+
+
+class _RingBuffer:
+    """
+    Fixed-size history of one vital sign
+    
+    Values are written in place into a preallocated list, which is cheaper
+    per reading than writing a column into a shared NumPy array, and unlike
+    an array.array keeps the original objects, so summing them doesn't box
+    every item again. Trend windows
+    are summed afresh from the last 2 * TREND_WINDOW slots instead of kept
+    as running sums: still O(1) per reading, and it doesn't accumulate
+    rounding error that would tip the > 0.5°C comparison.
+    """
+    
+    def __init__(self, capacity: int = 60):
+        self._buf = [0.0] * capacity
+        self._capacity = capacity
+        self._idx = 0      # Next write position
+        self._count = 0
+    
+    def append(self, value: float):
+        """Add a value, evicting the oldest once the buffer is full"""
+        self._buf[self._idx] = value
+        self._idx = (self._idx + 1) % self._capacity
+        if self._count < self._capacity:
+            self._count += 1
+    
+    def trend(self) -> Optional[tuple]:
+        """(older, recent) TREND_WINDOW averages, or None until both windows are filled"""
+        if self._count < 2 * TREND_WINDOW:
+            return None
+        
+        start = self._idx - 2 * TREND_WINDOW
+        if start >= 0:
+            window = self._buf[start:self._idx]
+        else:
+            window = self._buf[start:] + self._buf[:self._idx]
+        return sum(window[:TREND_WINDOW]) / TREND_WINDOW, sum(window[TREND_WINDOW:]) / TREND_WINDOW
+    
+    def last(self) -> float:
+        """Most recently appended value"""
+        return self._buf[(self._idx - 1) % self._capacity]
+    
+    def values(self) -> List[float]:
+        """
+        Stored values in storage order, not oldest first
+        
+        Writes fill the buffer from the start and only wrap once it is
+        full, so the stored values are always a prefix of it.
+        """
+        return self._buf[:self._count]
+    
+    def clear(self):
+        """Drop all values"""
+        self._idx = 0
+        self._count = 0
+    
+    def __len__(self) -> int:
+        return self._count
+
 
 class VitalSignsAnalyzer:
     """Analyzes vital signs and detects abnormalities"""
     
-    def __init__(self, thresholds: Dict):
+    # Alert message templates, formatted only for alerts that actually fire
+    _MSG_CRIT_BRADY = 'Critical bradycardia detected: {} bpm (extremely low heart rate)'
+    _MSG_CRIT_TACHY = 'Critical tachycardia detected: {} bpm (extremely high heart rate)'
+    _MSG_BRADY = 'Bradycardia detected: {} bpm (low heart rate)'
+    _MSG_TACHY = 'Tachycardia detected: {} bpm (high heart rate)'
+    _MSG_CRIT_HYPOXEMIA = 'Critical hypoxemia detected: {}% (dangerously low blood oxygen)'
+    _MSG_LOW_SPO2 = 'Low blood oxygen detected: {}%'
+    _MSG_CRIT_HYPOTHERMIA = 'Critical hypothermia detected: {:.1f}°C (dangerously low temperature)'
+    _MSG_CRIT_HYPERTHERMIA = 'Critical hyperthermia detected: {:.1f}°C (dangerously high temperature)'
+    _MSG_LOW_TEMP = 'Low body temperature detected: {:.1f}°C'
+    _MSG_FEVER = 'Fever detected: {:.1f}°C'
+    _MSG_HR_TREND = 'Rapid heart rate increase detected: {:.0f} → {:.0f} bpm'
+    _MSG_SPO2_TREND = 'Declining blood oxygen trend detected: {:.0f}% → {:.0f}%'
+    _MSG_TEMP_TREND = 'Rising temperature trend detected: {:.1f}°C → {:.1f}°C'
+    
+    # Alert actions per vital, indexed by band code + 2: severity, message
+    # template and threshold key, or None for the normal band
+    _VITAL_ACTIONS = {
+        'heart_rate': (
+            ('critical', _MSG_CRIT_BRADY, 'critical_min'),
+            ('warning', _MSG_BRADY, 'min'),
+            None,
+            ('warning', _MSG_TACHY, 'max'),
+            ('critical', _MSG_CRIT_TACHY, 'critical_max'),
+        ),
+        'spo2': (
+            ('critical', _MSG_CRIT_HYPOXEMIA, 'critical_min'),
+            ('warning', _MSG_LOW_SPO2, 'min'),
+            None,
+            None,
+            None,
+        ),
+        'temperature': (
+            ('critical', _MSG_CRIT_HYPOTHERMIA, 'critical_min'),
+            ('warning', _MSG_LOW_TEMP, 'min'),
+            None,
+            ('warning', _MSG_FEVER, 'max'),
+            ('critical', _MSG_CRIT_HYPERTHERMIA, 'critical_max'),
+        ),
+    }
+    
+    # Trend bit, alert type, severity and message template, in history order
+    _TREND_ACTIONS = (
+        (TREND_HR_RISE, 'heart_rate_trend', 'warning', _MSG_HR_TREND),
+        (TREND_SPO2_DECLINE, 'spo2_trend', 'warning', _MSG_SPO2_TREND),
+        (TREND_TEMP_RISE, 'temperature_trend', 'info', _MSG_TEMP_TREND),
+    )
+    
+    def __init__(self, thresholds: Mapping[str, Union[Mapping, Limits]]):
         """
         Initialize analyzer with threshold configuration
         
         Args:
-            thresholds: Dictionary containing threshold values for each vital sign
+            thresholds: Threshold values for each vital sign, as config
+                dictionaries or Limits
         """
         self.thresholds = thresholds
         
+        # Each vital's limits converted to Limits once
+        self.limits = {
+            vital: Limits.from_config(thresholds.get(vital, {}))
+            for vital in self._VITAL_ACTIONS
+        }
+        
+        # Limits flattened once for _check_vitals; SpO2 has no upper limits
+        hr = self.limits['heart_rate']
+        spo2 = self.limits['spo2']
+        temp = self.limits['temperature']
+        self._limits = np.array([
+            [_limit(hr.critical_min, 40), _limit(hr.min, 60), _limit(hr.max, 100), _limit(hr.critical_max, 150)],
+            [_limit(spo2.critical_min, 90), _limit(spo2.min, 95), _INF, _INF],
+            [_limit(temp.critical_min, 35.0), _limit(temp.min, 36.1), _limit(temp.max, 37.8), _limit(temp.critical_max, 39.0)],
+        ], dtype=np.float64)
+        
+        # The same limits as Python floats for the comparisons used without
+        # Numba, and a reused input buffer for the kernel used with it
+        self._bands = tuple(tuple(float(v) for v in row) for row in self._limits)
+        self._vitals = np.empty(6, dtype=np.float64)
+        
+        # Alert actions with the configured threshold resolved for each band,
+        # so building an alert does no threshold lookups
+        self._actions = {
+            vital: tuple(
+                None if action is None else
+                (action[0], action[1], getattr(self.limits[vital], action[2]))
+                for action in actions
+            )
+            for vital, actions in self._VITAL_ACTIONS.items()
+        }
+        
         # Historical data for trend analysis
-        self.heart_rate_history = deque(maxlen=60)  # Last 60 readings
-        self.spo2_history = deque(maxlen=60)
-        self.temp_history = deque(maxlen=60)
+        self.heart_rate_history = _RingBuffer(60)  # Last 60 readings
+        self.spo2_history = _RingBuffer(60)
+        self.temp_history = _RingBuffer(60)
+        self._histories = {
+            'heart_rate': self.heart_rate_history,
+            'spo2': self.spo2_history,
+            'temperature': self.temp_history
+        }
         
-        # Alert cooldown to prevent spam
+        # Alert cooldown to prevent spam: (type, severity) -> time.monotonic()
         self.last_alert_time = {}
         self.alert_cooldown = 300  # 5 minutes
         
@@ -47,22 +326,54 @@ class VitalSignsAnalyzer:
         alerts = []
         
         try:
+            hr = readings.get('heart_rate')
+            spo2 = readings.get('spo2')
+            temp = readings.get('temperature')
+            
             # Update history
-            if 'heart_rate' in readings:
-                self.heart_rate_history.append(readings['heart_rate'])
-            if 'spo2' in readings:
-                self.spo2_history.append(readings['spo2'])
-            if 'temperature' in readings:
-                self.temp_history.append(readings['temperature'])
+            if hr is not None:
+                self.heart_rate_history.append(hr)
+            if spo2 is not None:
+                self.spo2_history.append(spo2)
+            if temp is not None:
+                self.temp_history.append(temp)
             
-            # Analyze each vital sign
-            alerts.extend(self._analyze_heart_rate(readings))
-            alerts.extend(self._analyze_spo2(readings))
-            alerts.extend(self._analyze_temperature(readings))
-            alerts.extend(self._analyze_trends())
+            # Convert to Celsius if needed
+            if temp is not None and readings.get('temperature_unit', 'C') == 'F':
+                temp = (temp - 32) * 5/9
             
-            # Filter alerts by cooldown
-            alerts = self._apply_cooldown(alerts)
+            windows = (
+                self.heart_rate_history.trend(),
+                self.spo2_history.trend(),
+                self.temp_history.trend()
+            )
+            
+            if HAS_NUMBA:
+                vitals = self._vitals
+                vitals[0] = _NAN if hr is None else hr
+                vitals[1] = _NAN if spo2 is None else spo2
+                vitals[2] = _NAN if temp is None else temp
+                for i, window in enumerate(windows, 3):
+                    vitals[i] = _NAN if window is None else window[1] - window[0]
+                codes = _check_vitals(vitals, self._limits)
+            else:
+                codes = self._check_vitals_scalar(hr, spo2, temp, windows)
+            
+            if not any(codes):
+                return alerts
+            
+            # One timestamp shared by every alert raised for this reading,
+            # and one monotonic time for the cooldown checks
+            now = datetime.now()
+            current_time = time.monotonic()
+            
+            for i, vital, value in ((0, 'heart_rate', hr), (1, 'spo2', spo2), (2, 'temperature', temp)):
+                if codes[i]:
+                    alert = self._vital_alert(vital, int(codes[i]), value, now, current_time)
+                    if alert is not None:
+                        alerts.append(alert)
+            if codes[3]:
+                alerts.extend(self._trend_alerts(int(codes[3]), windows, now, current_time))
             
             return alerts
             
@@ -70,270 +381,134 @@ class VitalSignsAnalyzer:
             logger.error(f"Error analyzing readings: {e}")
             return []
     
-    def _analyze_heart_rate(self, readings: Dict) -> List[Dict]:
-        """Analyze heart rate for abnormalities"""
-        alerts = []
-        
-        if 'heart_rate' not in readings:
-            return alerts
-        
-        hr = readings['heart_rate']
-        thresholds = self.thresholds.get('heart_rate', {})
-        
-        # Critical bradycardia
-        if hr < thresholds.get('critical_min', 40):
-            alerts.append({
-                'type': 'heart_rate',
-                'severity': 'critical',
-                'message': f'Critical bradycardia detected: {hr} bpm (extremely low heart rate)',
-                'value': hr,
-                'threshold': thresholds.get('critical_min'),
-                'timestamp': datetime.now()
-            })
-        
-        # Critical tachycardia
-        elif hr > thresholds.get('critical_max', 150):
-            alerts.append({
-                'type': 'heart_rate',
-                'severity': 'critical',
-                'message': f'Critical tachycardia detected: {hr} bpm (extremely high heart rate)',
-                'value': hr,
-                'threshold': thresholds.get('critical_max'),
-                'timestamp': datetime.now()
-            })
-        
-        # Warning bradycardia
-        elif hr < thresholds.get('min', 60):
-            alerts.append({
-                'type': 'heart_rate',
-                'severity': 'warning',
-                'message': f'Bradycardia detected: {hr} bpm (low heart rate)',
-                'value': hr,
-                'threshold': thresholds.get('min'),
-                'timestamp': datetime.now()
-            })
-        
-        # Warning tachycardia
-        elif hr > thresholds.get('max', 100):
-            alerts.append({
-                'type': 'heart_rate',
-                'severity': 'warning',
-                'message': f'Tachycardia detected: {hr} bpm (high heart rate)',
-                'value': hr,
-                'threshold': thresholds.get('max'),
-                'timestamp': datetime.now()
-            })
-        
-        return alerts
+    def _check_vitals_scalar(self, hr, spo2, temp, windows) -> tuple:
+        """_check_vitals with plain comparisons, for when Numba isn't installed"""
+        hr_band, spo2_band, temp_band = self._bands
+        hr_window, spo2_window, temp_window = windows
+        
+        trend = 0
+        if hr_window is not None and hr_window[1] > hr_window[0] + 20:
+            trend |= TREND_HR_RISE
+        if spo2_window is not None and spo2_window[1] < spo2_window[0] - 3:
+            trend |= TREND_SPO2_DECLINE
+        if temp_window is not None and temp_window[1] > temp_window[0] + 0.5:
+            trend |= TREND_TEMP_RISE
+        
+        return (
+            _band_scalar(hr, hr_band),
+            _band_scalar(spo2, spo2_band),
+            _band_scalar(temp, temp_band),
+            trend
+        )
     
-    def _analyze_spo2(self, readings: Dict) -> List[Dict]:
-        """Analyze blood oxygen saturation for abnormalities"""
-        alerts = []
-        
-        if 'spo2' not in readings:
-            return alerts
-        
-        spo2 = readings['spo2']
-        thresholds = self.thresholds.get('spo2', {})
-        
-        # Critical hypoxemia
-        if spo2 < thresholds.get('critical_min', 90):
-            alerts.append({
-                'type': 'spo2',
-                'severity': 'critical',
-                'message': f'Critical hypoxemia detected: {spo2}% (dangerously low blood oxygen)',
-                'value': spo2,
-                'threshold': thresholds.get('critical_min'),
-                'timestamp': datetime.now()
-            })
+    def _emit(
+        self,
+        alert_type: str,
+        severity: str,
+        factory: Callable[[], Dict],
+        current_time: float
+    ) -> Optional[Dict]:
+        """
+        Build an alert unless its (type, severity) is in cooldown
         
-        # Warning hypoxemia
-        elif spo2 < thresholds.get('min', 95):
-            alerts.append({
-                'type': 'spo2',
-                'severity': 'warning',
-                'message': f'Low blood oxygen detected: {spo2}%',
-                'value': spo2,
-                'threshold': thresholds.get('min'),
-                'timestamp': datetime.now()
-            })
+        The cooldown is checked before factory() runs, so alerts suppressed
+        to prevent spam cost no message formatting or dict construction.
+        current_time is a time.monotonic() value, so cooldowns are immune to
+        wall-clock adjustments.
         
-        return alerts
+        Returns:
+            The alert dictionary, or None if suppressed
+        """
+        alert_key = (alert_type, severity)
+        
+        # Check if enough time has passed since last alert of this type
+        last_time = self.last_alert_time.get(alert_key)
+        if last_time is not None and current_time - last_time < self.alert_cooldown:
+            # Skip this alert (cooldown period not elapsed)
+            logger.debug("Alert cooldown active for %s_%s", alert_type, severity)
+            return None
+        
+        # Update last alert time and build the alert
+        self.last_alert_time[alert_key] = current_time
+        return factory()
     
-    def _analyze_temperature(self, readings: Dict) -> List[Dict]:
-        """Analyze body temperature for abnormalities"""
-        alerts = []
-        
-        if 'temperature' not in readings:
-            return alerts
-        
-        temp = readings['temperature']
-        unit = readings.get('temperature_unit', 'C')
-        thresholds = self.thresholds.get('temperature', {})
-        
-        # Convert to Celsius if needed
-        if unit == 'F':
-            temp = (temp - 32) * 5/9
-        
-        # Critical hypothermia
-        if temp < thresholds.get('critical_min', 35.0):
-            alerts.append({
-                'type': 'temperature',
-                'severity': 'critical',
-                'message': f'Critical hypothermia detected: {temp:.1f}°C (dangerously low temperature)',
-                'value': temp,
-                'threshold': thresholds.get('critical_min'),
-                'timestamp': datetime.now()
-            })
-        
-        # Critical hyperthermia
-        elif temp > thresholds.get('critical_max', 39.0):
-            alerts.append({
-                'type': 'temperature',
-                'severity': 'critical',
-                'message': f'Critical hyperthermia detected: {temp:.1f}°C (dangerously high temperature)',
-                'value': temp,
-                'threshold': thresholds.get('critical_max'),
-                'timestamp': datetime.now()
-            })
-        
-        # Warning hypothermia
-        elif temp < thresholds.get('min', 36.1):
-            alerts.append({
-                'type': 'temperature',
-                'severity': 'warning',
-                'message': f'Low body temperature detected: {temp:.1f}°C',
-                'value': temp,
-                'threshold': thresholds.get('min'),
-                'timestamp': datetime.now()
-            })
-        
-        # Warning fever
-        elif temp > thresholds.get('max', 37.8):
-            severity = 'warning' if temp < 38.5 else 'critical'
-            alerts.append({
-                'type': 'temperature',
-                'severity': severity,
-                'message': f'Fever detected: {temp:.1f}°C',
-                'value': temp,
-                'threshold': thresholds.get('max'),
-                'timestamp': datetime.now()
-            })
-        
-        return alerts
+    def _vital_alert(
+        self,
+        vital: str,
+        code: int,
+        value,
+        now: datetime,
+        current_time: float
+    ) -> Optional[Dict]:
+        """Alert for a nonzero threshold code from _check_vitals, None if in cooldown"""
+        severity, template, threshold = self._actions[vital][code + 2]
+        
+        # Fever escalates to critical before the hyperthermia limit is reached
+        if vital == 'temperature' and code == 1 and value >= 38.5:
+            severity = 'critical'
+        
+        return self._emit(vital, severity, lambda: {
+            'type': vital,
+            'severity': severity,
+            'message': template.format(value),
+            'value': value,
+            'threshold': threshold,
+            'timestamp': now
+        }, current_time)
     
-    def _analyze_trends(self) -> List[Dict]:
-        """Analyze trends in vital signs over time"""
+    def _trend_alerts(
+        self,
+        trend_code: int,
+        windows: tuple,
+        now: datetime,
+        current_time: float
+    ) -> List[Dict]:
+        """Alerts for the trends flagged in the _check_vitals bitmask, minus those in cooldown"""
         alerts = []
         
-        # Rapid heart rate increase
-        if len(self.heart_rate_history) >= 10:
-            recent_avg = sum(list(self.heart_rate_history)[-5:]) / 5
-            older_avg = sum(list(self.heart_rate_history)[-10:-5]) / 5
+        for (bit, alert_type, severity, template), window in zip(self._TREND_ACTIONS, windows):
+            if not trend_code & bit:
+                continue
             
-            if recent_avg > older_avg + 20:  # Increase of >20 bpm in short time
-                alerts.append({
-                    'type': 'heart_rate_trend',
-                    'severity': 'warning',
-                    'message': f'Rapid heart rate increase detected: {older_avg:.0f} → {recent_avg:.0f} bpm',
+            def build():
+                older_avg, recent_avg = window
+                return {
+                    'type': alert_type,
+                    'severity': severity,
+                    'message': template.format(older_avg, recent_avg),
                     'value': recent_avg - older_avg,
-                    'timestamp': datetime.now()
-                })
-        
-        # Declining SpO2 trend
-        if len(self.spo2_history) >= 10:
-            recent_avg = sum(list(self.spo2_history)[-5:]) / 5
-            older_avg = sum(list(self.spo2_history)[-10:-5]) / 5
+                    'timestamp': now
+                }
             
-            if recent_avg < older_avg - 3:  # Decrease of >3% in short time
-                alerts.append({
-                    'type': 'spo2_trend',
-                    'severity': 'warning',
-                    'message': f'Declining blood oxygen trend detected: {older_avg:.0f}% → {recent_avg:.0f}%',
-                    'value': recent_avg - older_avg,
-                    'timestamp': datetime.now()
-                })
-        
-        # Rising temperature trend
-        if len(self.temp_history) >= 10:
-            recent_avg = sum(list(self.temp_history)[-5:]) / 5
-            older_avg = sum(list(self.temp_history)[-10:-5]) / 5
-            
-            if recent_avg > older_avg + 0.5:  # Increase of >0.5°C in short time
-                alerts.append({
-                    'type': 'temperature_trend',
-                    'severity': 'info',
-                    'message': f'Rising temperature trend detected: {older_avg:.1f}°C → {recent_avg:.1f}°C',
-                    'value': recent_avg - older_avg,
-                    'timestamp': datetime.now()
-                })
+            alert = self._emit(alert_type, severity, build, current_time)
+            if alert is not None:
+                alerts.append(alert)
         
         return alerts
     
-    def _apply_cooldown(self, alerts: List[Dict]) -> List[Dict]:
-        """Filter alerts based on cooldown period to prevent spam"""
-        filtered_alerts = []
-        current_time = datetime.now()
-        
-        for alert in alerts:
-            alert_key = f"{alert['type']}_{alert['severity']}"
-            
-            # Check if enough time has passed since last alert of this type
-            if alert_key in self.last_alert_time:
-                time_since_last = (current_time - self.last_alert_time[alert_key]).total_seconds()
-                
-                if time_since_last < self.alert_cooldown:
-                    # Skip this alert (cooldown period not elapsed)
-                    logger.debug(f"Alert cooldown active for {alert_key}")
-                    continue
-            
-            # Update last alert time and include alert
-            self.last_alert_time[alert_key] = current_time
-            filtered_alerts.append(alert)
-        
-        return filtered_alerts
-    
     def get_statistics(self) -> Dict:
         """Get statistics from historical data"""
         stats = {}
         
-        if self.heart_rate_history:
-            hr_list = list(self.heart_rate_history)
-            stats['heart_rate'] = {
-                'current': hr_list[-1],
-                'average': sum(hr_list) / len(hr_list),
-                'min': min(hr_list),
-                'max': max(hr_list),
-                'count': len(hr_list)
-            }
-        
-        if self.spo2_history:
-            spo2_list = list(self.spo2_history)
-            stats['spo2'] = {
-                'current': spo2_list[-1],
-                'average': sum(spo2_list) / len(spo2_list),
-                'min': min(spo2_list),
-                'max': max(spo2_list),
-                'count': len(spo2_list)
-            }
-        
-        if self.temp_history:
-            temp_list = list(self.temp_history)
-            stats['temperature'] = {
-                'current': temp_list[-1],
-                'average': sum(temp_list) / len(temp_list),
-                'min': min(temp_list),
-                'max': max(temp_list),
-                'count': len(temp_list)
-            }
+        # Order doesn't matter for these, so reduce the stored prefix as is;
+        # for 60 values the builtins beat NumPy's per-call overhead
+        for name, history in self._histories.items():
+            if history:
+                values = history.values()
+                stats[name] = {
+                    'current': history.last(),
+                    'average': sum(values) / len(values),
+                    'min': min(values),
+                    'max': max(values),
+                    'count': len(values)
+                }
         
         return stats
     
     def reset_history(self):
         """Clear historical data"""
-        self.heart_rate_history.clear()
-        self.spo2_history.clear()
-        self.temp_history.clear()
+        for history in self._histories.values():
+            history.clear()
         self.last_alert_time.clear()
         logger.info("Analyzer history reset")
 
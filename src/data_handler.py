@@ -5,26 +5,249 @@ Manages database operations and data export
 
 import sqlite3
 import csv
+import time
+import atexit
 import logging
-from typing import Dict, List, Optional
+import itertools
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
 from datetime import datetime, timedelta
 from pathlib import Path
 
+if TYPE_CHECKING:
+    import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# PRAGMA auto_vacuum value for INCREMENTAL mode
+_AUTO_VACUUM_INCREMENTAL = 2
+
+# Rows fetched per round trip when exporting to CSV
+_EXPORT_CHUNK_ROWS = 4096
+
+_CREATE_READINGS_SQL = """
+    CREATE TABLE IF NOT EXISTS readings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        heart_rate INTEGER,
+        spo2 INTEGER,
+        temperature REAL,
+        temperature_unit TEXT DEFAULT 'C'
+    )
+"""
+
+_CREATE_ALERTS_SQL = """
+    CREATE TABLE IF NOT EXISTS alerts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        alert_type TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        message TEXT NOT NULL,
+        value REAL,
+        threshold REAL,
+        acknowledged INTEGER DEFAULT 0
+    )
+"""
+
+_CREATE_INDEXES_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_readings_timestamp ON readings(timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON alerts(timestamp)",
+    # Severity-filtered alert listings, newest first
+    "CREATE INDEX IF NOT EXISTS idx_alerts_sev_ts ON alerts(severity, timestamp DESC)",
+    # Unacknowledged alerts only; stays small as alerts are acknowledged
+    "CREATE INDEX IF NOT EXISTS idx_alerts_unack ON alerts(timestamp DESC) WHERE acknowledged = 0",
+    # Covering index so get_statistics aggregates without touching the table
+    "CREATE INDEX IF NOT EXISTS idx_readings_cov ON readings(timestamp, heart_rate, spo2, temperature)",
+)
+
+# Whole schema as one script, run in a single executescript call
+_SCHEMA_SQL = ";\n".join((_CREATE_READINGS_SQL, _CREATE_ALERTS_SQL) + _CREATE_INDEXES_SQL) + ";"
+
+_INSERT_READING_SQL = """
+    INSERT INTO readings (timestamp, heart_rate, spo2, temperature, temperature_unit)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_INSERT_ALERT_SQL = """
+    INSERT INTO alerts (timestamp, alert_type, severity, message, value, threshold)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_ACKNOWLEDGE_ALERT_SQL = "UPDATE alerts SET acknowledged = 1 WHERE id = ?"
+
+_STATS_SELECT = """
+    SELECT 
+        COUNT(*) as count,
+        AVG(heart_rate) as avg_hr,
+        MIN(heart_rate) as min_hr,
+        MAX(heart_rate) as max_hr,
+        AVG(spo2) as avg_spo2,
+        MIN(spo2) as min_spo2,
+        MAX(spo2) as max_spo2,
+        AVG(temperature) as avg_temp,
+        MIN(temperature) as min_temp,
+        MAX(temperature) as max_temp
+"""
+
+_RECENT_STATS_SQL = _STATS_SELECT + """
+    FROM (
+        SELECT heart_rate, spo2, temperature FROM readings
+        ORDER BY timestamp DESC LIMIT ?
+    )
+"""
+
+
+
+def _filtered_queries(head: str, filters: tuple, tail: str = "") -> Dict[tuple, str]:
+    """
+    Precompute a query for every combination of optional filters
+    
+    Keys are tuples of booleans, one per filter, saying whether that filter
+    is applied. Each variant is a fixed string, so SQLite's statement cache
+    keeps all of them prepared.
+    """
+    queries = {}
+    for flags in itertools.product((False, True), repeat=len(filters)):
+        conditions = [cond for cond, on in zip(filters, flags) if on]
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        queries[flags] = head + where + tail
+    return queries
+
+
+_DATE_FILTERS = ("timestamp >= ?", "timestamp <= ?")
+
+_READINGS_QUERIES = _filtered_queries(
+    "SELECT * FROM readings", _DATE_FILTERS, " ORDER BY timestamp DESC LIMIT ?"
+)
+
+# Stored timestamps are local time; the 'utc' modifier turns them back
+# into Unix seconds for the datetime64 field
+_READINGS_ARRAY_QUERIES = _filtered_queries(
+    "SELECT CAST(strftime('%s', timestamp, 'utc') AS INTEGER),"
+    " heart_rate, spo2, temperature FROM readings",
+    _DATE_FILTERS,
+    " ORDER BY timestamp DESC LIMIT ?"
+)
+
+# Record layout returned by DataHandler.get_readings_array; timestamps are
+# UTC and vitals are float64 so missing (NULL) values come back as NaN.
+# Built on first use (see __getattr__) so that importing this module for
+# --cleanup or --export does not import NumPy.
+_READINGS_ARRAY_FIELDS = [
+    ('timestamp', 'M8[s]'),
+    ('heart_rate', 'f8'),
+    ('spo2', 'f8'),
+    ('temperature', 'f8'),
+]
+
+
+def _readings_array_dtype():
+    """READINGS_ARRAY_DTYPE, built (and NumPy imported) on first use"""
+    dtype = globals().get('READINGS_ARRAY_DTYPE')
+    if dtype is None:
+        import numpy as np
+        dtype = globals()['READINGS_ARRAY_DTYPE'] = np.dtype(_READINGS_ARRAY_FIELDS)
+    return dtype
+
+
+def __getattr__(name):
+    """Build READINGS_ARRAY_DTYPE lazily (PEP 562)"""
+    if name == 'READINGS_ARRAY_DTYPE':
+        return _readings_array_dtype()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+_ALERTS_QUERIES = _filtered_queries(
+    "SELECT * FROM alerts", _DATE_FILTERS + ("severity = ?",), " ORDER BY timestamp DESC LIMIT ?"
+)
+
+_STATS_QUERIES = _filtered_queries(_STATS_SELECT + " FROM readings", _DATE_FILTERS)
+
+_EXPORT_QUERIES = _filtered_queries(
+    "SELECT timestamp, heart_rate, spo2, temperature, temperature_unit FROM readings",
+    _DATE_FILTERS,
+    " ORDER BY timestamp ASC"
+)
+
+_DELETE_OLD_READINGS_SQL = "DELETE FROM readings WHERE timestamp < ?"
+
+_DELETE_OLD_ALERTS_SQL = "DELETE FROM alerts WHERE timestamp < ?"
+
+# Page cache of up to 64 MiB per connection (negative sizes are in KiB)
+_CACHE_SIZE_PRAGMA = "PRAGMA cache_size=-65536"
+
+# SQLite treats a negative LIMIT as no limit (LIMIT NULL is an error)
+_NO_LIMIT = -1
+
+
+def _reading_timestamp(readings: Dict) -> str:
+    """
+    Timestamp for a stored reading
+    
+    Uses the time the reading was taken (not the time it is written) as
+    local 'YYYY-MM-DD HH:MM:SS', the same clock as alert timestamps and the
+    datetime.now() windows that filters and cleanup compare against.
+    """
+    ts = readings.get('timestamp')
+    if ts is None:
+        ts = time.time()
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts))
+
+
+def _reading_row(readings: Dict) -> tuple:
+    """Parameter tuple for _INSERT_READING_SQL"""
+    return (
+        _reading_timestamp(readings),
+        readings.get('heart_rate'),
+        readings.get('spo2'),
+        readings.get('temperature'),
+        readings.get('temperature_unit', 'C')
+    )
+
+
+def _alert_timestamp(alert: Dict) -> datetime:
+    """Alert timestamp as a datetime (alerts may carry time.time_ns() ints)"""
+    ts = alert.get('timestamp')
+    if ts is None:
+        return datetime.now()
+    if isinstance(ts, int):
+        return datetime.fromtimestamp(ts / 1e9)
+    return ts
+
 
 class DataHandler:
     """Handles data storage and retrieval"""
     
-    def __init__(self, db_path: str = 'data/edgepulse.db'):
+    def __init__(
+        self,
+        db_path: str = 'data/edgepulse.db',
+        batch_size: int = 32,
+        flush_interval: float = 5
+    ):
         """
         Initialize database connection
         
         Args:
             db_path: Path to SQLite database file
+            batch_size: Readings buffered before they are written in one transaction
+            flush_interval: Max seconds a buffered reading waits before being written
         """
         self.db_path = db_path
         
+        # Readings are buffered and written with executemany; queries flush
+        # first so callers always see their own writes
+        self._reading_buf = []
+        self._flush_threshold = batch_size
+        self._flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        self._buf_lock = threading.Lock()
+        
+        # One shared connection does all the writing, serialized by an RLock;
+        # each reading thread (dashboard workers, the monitor) gets its own
+        # connection so WAL lets queries run alongside writes
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._readers = {}
+        
         # Ensure data directory exists
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
@@ -32,57 +255,77 @@ class DataHandler:
         self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row  # Enable column access by name
         
+        # WAL lets the dashboard read while readings are written and, with
+        # synchronous=NORMAL, avoids an fsync on every commit. In-memory
+        # databases keep their MEMORY journal
+        if db_path != ':memory:':
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute(_CACHE_SIZE_PRAGMA)
+        
         self._create_tables()
+        atexit.register(self.flush)
         logger.info(f"Database initialized: {db_path}")
     
+    def _reader(self) -> sqlite3.Connection:
+        """Read connection for the calling thread, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        
+        if self.db_path == ':memory:':
+            # Other connections would open a different, empty database
+            return self.conn
+        
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(_CACHE_SIZE_PRAGMA)
+        with self._write_lock:
+            # Request threads come and go; close connections they left behind
+            for thread in [t for t in self._readers if not t.is_alive()]:
+                self._readers.pop(thread).close()
+            self._readers[threading.current_thread()] = conn
+        self._local.conn = conn
+        return conn
+    
+    def _enable_incremental_vacuum(self):
+        """
+        Switch the database to incremental auto-vacuum
+        
+        Empty databases pick the setting up immediately; databases that
+        already have a header written need a one-time VACUUM to rebuild
+        with it.
+        """
+        if self._auto_vacuum_mode() == _AUTO_VACUUM_INCREMENTAL:
+            return
+        
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        
+        if self._auto_vacuum_mode() != _AUTO_VACUUM_INCREMENTAL:
+            logger.info("Rebuilding database for incremental auto-vacuum")
+            self.conn.execute("VACUUM")
+    
+    def _auto_vacuum_mode(self) -> int:
+        """Current PRAGMA auto_vacuum setting"""
+        return self.conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    
     def _create_tables(self):
         """Create database tables if they don't exist"""
-        cursor = self.conn.cursor()
-        
-        # Readings table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS readings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                heart_rate INTEGER,
-                spo2 INTEGER,
-                temperature REAL,
-                temperature_unit TEXT DEFAULT 'C'
-            )
-        """)
-        
-        # Alerts table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS alerts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                alert_type TEXT NOT NULL,
-                severity TEXT NOT NULL,
-                message TEXT NOT NULL,
-                value REAL,
-                threshold REAL,
-                acknowledged INTEGER DEFAULT 0
-            )
-        """)
-        
-        # Create indexes for faster queries
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_readings_timestamp 
-            ON readings(timestamp)
-        """)
-        
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_alerts_timestamp 
-            ON alerts(timestamp)
-        """)
-        
-        self.conn.commit()
+        self._enable_incremental_vacuum()
+        
+        # Readings and alerts tables plus their indexes, in one call
+        self.conn.executescript(_SCHEMA_SQL)
         logger.debug("Database tables created/verified")
     
     def save_reading(self, readings: Dict) -> bool:
         """
         Save vital signs reading to database
         
+        The reading is buffered and written together with others once
+        batch_size readings are pending or flush_interval has elapsed.
+        
         Args:
             readings: Dictionary containing vital sign values
             
@@ -90,26 +333,71 @@ class DataHandler:
             True if successful, False otherwise
         """
         try:
-            cursor = self.conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO readings (heart_rate, spo2, temperature, temperature_unit)
-                VALUES (?, ?, ?, ?)
-            """, (
-                readings.get('heart_rate'),
-                readings.get('spo2'),
-                readings.get('temperature'),
-                readings.get('temperature_unit', 'C')
-            ))
-            
-            self.conn.commit()
-            logger.debug(f"Reading saved: HR={readings.get('heart_rate')}, SpO2={readings.get('spo2')}")
-            return True
+            with self._buf_lock:
+                self._reading_buf.append(_reading_row(readings))
+                due = (len(self._reading_buf) >= self._flush_threshold or
+                       time.monotonic() - self._last_flush >= self._flush_interval)
+            
+            logger.debug(f"Reading buffered: HR={readings.get('heart_rate')}, SpO2={readings.get('spo2')}")
+            return self.flush() if due else True
             
         except Exception as e:
             logger.error(f"Failed to save reading: {e}")
             return False
     
+    def save_readings(self, readings_list: List[Dict]) -> bool:
+        """
+        Save several vital signs readings in a single transaction
+        
+        Args:
+            readings_list: List of reading dictionaries
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not readings_list:
+            return True
+        
+        try:
+            with self._write_lock:
+                self.conn.executemany(
+                    _INSERT_READING_SQL,
+                    [_reading_row(readings) for readings in readings_list]
+                )
+            
+                self.conn.commit()
+            logger.debug(f"Saved batch of {len(readings_list)} readings")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to save readings batch: {e}")
+            return False
+    
+    def flush(self) -> bool:
+        """
+        Write buffered readings to the database in one transaction
+        
+        Returns:
+            True if successful (or nothing was pending), False otherwise
+        """
+        with self._buf_lock:
+            rows, self._reading_buf = self._reading_buf, []
+            self._last_flush = time.monotonic()
+        
+        if not rows or self.conn is None:
+            return True
+        
+        try:
+            with self._write_lock:
+                self.conn.executemany(_INSERT_READING_SQL, rows)
+                self.conn.commit()
+            logger.debug(f"Flushed {len(rows)} buffered readings")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to flush {len(rows)} readings: {e}")
+            return False
+    
     def save_alert(self, alert: Dict) -> bool:
         """
         Save alert to database
@@ -121,21 +409,18 @@ class DataHandler:
             True if successful, False otherwise
         """
         try:
-            cursor = self.conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO alerts (timestamp, alert_type, severity, message, value, threshold)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                alert.get('timestamp', datetime.now()),
-                alert.get('type'),
-                alert.get('severity'),
-                alert.get('message'),
-                alert.get('value'),
-                alert.get('threshold')
-            ))
-            
-            self.conn.commit()
+            # Alerts are rare and must survive a crash, so commit each one
+            with self._write_lock:
+                self.conn.execute(_INSERT_ALERT_SQL, (
+                    _alert_timestamp(alert),
+                    alert.get('type'),
+                    alert.get('severity'),
+                    alert.get('message'),
+                    alert.get('value'),
+                    alert.get('threshold')
+                ))
+            
+                self.conn.commit()
             logger.debug(f"Alert saved: {alert.get('type')} ({alert.get('severity')})")
             return True
             
@@ -147,7 +432,7 @@ class DataHandler:
         self, 
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-        limit: int = 100
+        limit: Optional[int] = 100
     ) -> List[Dict]:
         """
         Retrieve readings from database
@@ -155,30 +440,20 @@ class DataHandler:
         Args:
             start_date: Start datetime for filtering
             end_date: End datetime for filtering
-            limit: Maximum number of readings to return
+            limit: Maximum number of readings to return (None for all)
             
         Returns:
             List of reading dictionaries
         """
+        self.flush()
+        
         try:
-            cursor = self.conn.cursor()
-            
-            query = "SELECT * FROM readings WHERE 1=1"
-            params = []
-            
-            if start_date:
-                query += " AND timestamp >= ?"
-                params.append(start_date)
-            
-            if end_date:
-                query += " AND timestamp <= ?"
-                params.append(end_date)
+            filters = (start_date, end_date)
+            query = _READINGS_QUERIES[tuple(bool(f) for f in filters)]
+            params = [f for f in filters if f]
+            params.append(_NO_LIMIT if limit is None else limit)
             
-            query += " ORDER BY timestamp DESC LIMIT ?"
-            params.append(limit)
-            
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
+            rows = self._reader().execute(query, params).fetchall()
             
             readings = [dict(row) for row in rows]
             return readings
@@ -187,12 +462,57 @@ class DataHandler:
             logger.error(f"Failed to retrieve readings: {e}")
             return []
     
+    def get_readings_array(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: Optional[int] = 100
+    ) -> 'np.ndarray':
+        """
+        Retrieve readings as a NumPy record array for numeric consumers
+        
+        Rows are loaded straight from the cursor into READINGS_ARRAY_DTYPE
+        records with np.fromiter, skipping the per-row sqlite3.Row and dict
+        objects that get_readings builds. Same filtering and ordering
+        (newest first) as get_readings.
+        
+        Args:
+            start_date: Start datetime for filtering
+            end_date: End datetime for filtering
+            limit: Maximum number of readings to return (None for all)
+            
+        Returns:
+            Record array with timestamp, heart_rate, spo2 and temperature fields
+        """
+        import numpy as np
+        
+        dtype = _readings_array_dtype()
+        self.flush()
+        
+        try:
+            filters = (start_date, end_date)
+            query = _READINGS_ARRAY_QUERIES[tuple(bool(f) for f in filters)]
+            params = [f for f in filters if f]
+            params.append(_NO_LIMIT if limit is None else limit)
+            
+            # Plain tuples from this cursor only; the connection keeps its
+            # sqlite3.Row factory
+            cursor = self._reader().cursor()
+            cursor.row_factory = None
+            cursor.execute(query, params)
+            
+            return np.fromiter(cursor, dtype=dtype)
+            
+        except Exception as e:
+            logger.error(f"Failed to retrieve readings array: {e}")
+            return np.empty(0, dtype=dtype)
+    
     def get_alerts(
         self,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
         severity: Optional[str] = None,
-        limit: int = 100
+        limit: Optional[int] = 100
     ) -> List[Dict]:
         """
         Retrieve alerts from database
@@ -201,34 +521,18 @@ class DataHandler:
             start_date: Start datetime for filtering
             end_date: End datetime for filtering
             severity: Filter by severity level
-            limit: Maximum number of alerts to return
+            limit: Maximum number of alerts to return (None for all)
             
         Returns:
             List of alert dictionaries
         """
         try:
-            cursor = self.conn.cursor()
-            
-            query = "SELECT * FROM alerts WHERE 1=1"
-            params = []
-            
-            if start_date:
-                query += " AND timestamp >= ?"
-                params.append(start_date)
+            filters = (start_date, end_date, severity)
+            query = _ALERTS_QUERIES[tuple(bool(f) for f in filters)]
+            params = [f for f in filters if f]
+            params.append(_NO_LIMIT if limit is None else limit)
             
-            if end_date:
-                query += " AND timestamp <= ?"
-                params.append(end_date)
-            
-            if severity:
-                query += " AND severity = ?"
-                params.append(severity)
-            
-            query += " ORDER BY timestamp DESC LIMIT ?"
-            params.append(limit)
-            
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
+            rows = self._reader().execute(query, params).fetchall()
             
             alerts = [dict(row) for row in rows]
             return alerts
@@ -257,36 +561,14 @@ class DataHandler:
         Returns:
             Dictionary containing statistical information
         """
+        self.flush()
+        
         try:
-            cursor = self.conn.cursor()
-            
-            query = """
-                SELECT 
-                    COUNT(*) as count,
-                    AVG(heart_rate) as avg_hr,
-                    MIN(heart_rate) as min_hr,
-                    MAX(heart_rate) as max_hr,
-                    AVG(spo2) as avg_spo2,
-                    MIN(spo2) as min_spo2,
-                    MAX(spo2) as max_spo2,
-                    AVG(temperature) as avg_temp,
-                    MIN(temperature) as min_temp,
-                    MAX(temperature) as max_temp
-                FROM readings
-                WHERE 1=1
-            """
-            params = []
-            
-            if start_date:
-                query += " AND timestamp >= ?"
-                params.append(start_date)
-            
-            if end_date:
-                query += " AND timestamp <= ?"
-                params.append(end_date)
+            filters = (start_date, end_date)
+            query = _STATS_QUERIES[tuple(bool(f) for f in filters)]
+            params = [f for f in filters if f]
             
-            cursor.execute(query, params)
-            row = cursor.fetchone()
+            row = self._reader().execute(query, params).fetchone()
             
             if row:
                 return dict(row)
@@ -297,6 +579,29 @@ class DataHandler:
             logger.error(f"Failed to calculate statistics: {e}")
             return {}
     
+    def get_recent_stats(self, n: int = 60) -> Dict:
+        """
+        Calculate statistics over the most recent readings
+        
+        Same keys as get_statistics, aggregated by SQLite over the last n
+        readings rather than a time range.
+        
+        Args:
+            n: Number of most recent readings to include
+            
+        Returns:
+            Dictionary containing statistical information
+        """
+        self.flush()
+        
+        try:
+            row = self._reader().execute(_RECENT_STATS_SQL, (n,)).fetchone()
+            return dict(row) if row else {}
+                
+        except Exception as e:
+            logger.error(f"Failed to calculate recent statistics: {e}")
+            return {}
+    
     def export_to_csv(
         self,
         output_file: str,
@@ -314,48 +619,37 @@ class DataHandler:
         Returns:
             True if successful, False otherwise
         """
+        self.flush()
+        
         try:
-            # Get all readings
-            cursor = self.conn.cursor()
-            
-            query = "SELECT * FROM readings WHERE 1=1"
-            params = []
-            
-            if start_date:
-                query += " AND timestamp >= ?"
-                params.append(start_date)
-            
-            if end_date:
-                query += " AND timestamp <= ?"
-                params.append(end_date)
+            # Get all readings, selecting only the exported columns so rows
+            # can be handed to the CSV writer as-is
+            filters = (start_date, end_date)
+            query = _EXPORT_QUERIES[tuple(bool(f) for f in filters)]
+            params = [f for f in filters if f]
             
-            query += " ORDER BY timestamp ASC"
-            
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
+            cursor = self._reader().execute(query, params)
+            rows = cursor.fetchmany(_EXPORT_CHUNK_ROWS)
             
             if not rows:
                 logger.warning("No data to export")
                 return False
             
-            # Write to CSV
-            with open(output_file, 'w', newline='') as f:
+            # Stream to CSV in chunks so memory stays bounded for large exports
+            exported = 0
+            with open(output_file, 'w', newline='', buffering=1 << 20) as f:
                 writer = csv.writer(f)
                 
                 # Write header
                 writer.writerow(['Timestamp', 'Heart Rate (bpm)', 'SpO2 (%)', 'Temperature', 'Unit'])
                 
                 # Write data
-                for row in rows:
-                    writer.writerow([
-                        row['timestamp'],
-                        row['heart_rate'],
-                        row['spo2'],
-                        row['temperature'],
-                        row['temperature_unit']
-                    ])
-            
-            logger.info(f"Exported {len(rows)} readings to {output_file}")
+                while rows:
+                    writer.writerows(rows)
+                    exported += len(rows)
+                    rows = cursor.fetchmany(_EXPORT_CHUNK_ROWS)
+            
+            logger.info(f"Exported {exported} readings to {output_file}")
             return True
             
         except Exception as e:
@@ -372,28 +666,25 @@ class DataHandler:
         Returns:
             Number of records deleted
         """
+        self.flush()
+        
         try:
-            cursor = self.conn.cursor()
-            
-            # Delete old readings
-            cursor.execute("""
-                DELETE FROM readings WHERE timestamp < ?
-            """, (cutoff_date,))
-            readings_deleted = cursor.rowcount
-            
-            # Delete old alerts
-            cursor.execute("""
-                DELETE FROM alerts WHERE timestamp < ?
-            """, (cutoff_date,))
-            alerts_deleted = cursor.rowcount
-            
-            self.conn.commit()
+            with self._write_lock:
+                # Both deletes commit together (or roll back together on error)
+                with self.conn:
+                    # Delete old readings
+                    readings_deleted = self.conn.execute(_DELETE_OLD_READINGS_SQL, (cutoff_date,)).rowcount
+                
+                    # Delete old alerts
+                    alerts_deleted = self.conn.execute(_DELETE_OLD_ALERTS_SQL, (cutoff_date,)).rowcount
             
-            total_deleted = readings_deleted + alerts_deleted
-            logger.info(f"Deleted {total_deleted} old records (readings: {readings_deleted}, alerts: {alerts_deleted})")
+                total_deleted = readings_deleted + alerts_deleted
+                logger.info(f"Deleted {total_deleted} old records (readings: {readings_deleted}, alerts: {alerts_deleted})")
             
-            # Vacuum database to reclaim space
-            cursor.execute("VACUUM")
+                # Reclaim the freed pages only, rather than rewriting the whole file
+                # (the pragma frees one page per step; executescript runs it to
+                # completion, a plain execute would step it only once)
+                self.conn.executescript("PRAGMA incremental_vacuum;")
             
             return total_deleted
             
@@ -412,13 +703,10 @@ class DataHandler:
             True if successful, False otherwise
         """
         try:
-            cursor = self.conn.cursor()
-            
-            cursor.execute("""
-                UPDATE alerts SET acknowledged = 1 WHERE id = ?
-            """, (alert_id,))
+            with self._write_lock:
+                self.conn.execute(_ACKNOWLEDGE_ALERT_SQL, (alert_id,))
             
-            self.conn.commit()
+                self.conn.commit()
             logger.debug(f"Alert {alert_id} acknowledged")
             return True
             
@@ -427,9 +715,17 @@ class DataHandler:
             return False
     
     def close(self):
-        """Close database connection"""
+        """Flush buffered readings and close database connection"""
         if self.conn:
-            self.conn.close()
+            self.flush()
+            atexit.unregister(self.flush)
+            with self._write_lock:
+                for reader in self._readers.values():
+                    reader.close()
+                self._readers = {}
+                self._local = threading.local()
+                self.conn.close()
+                self.conn = None
             logger.info("Database connection closed")
 
 
@@ -5,11 +5,24 @@ Handles communication with MAX30102, DS18B20, and other sensors
 
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from typing import Dict, Optional
-import random
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# FIFO samples collected per MAX30102 reading (~1 second at 100 Hz)
+SAMPLES_PER_READ = 100
+
+# Simulated readings drawn from the RNG in one go
+SIM_BATCH = 1024
+
+# Seconds between attempts to open a DS18B20 that isn't ready yet, and
+# attempts made before treating it as missing (about 30 seconds)
+DS18B20_RETRY_INTERVAL = 5
+DS18B20_INIT_RETRIES = 6
+
 try:
     import board
     import busio
@@ -34,15 +47,96 @@ except ImportError:
     logger.warning("GPIO library not available, using simulation mode")
     HAS_GPIO = False
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        """Fallback that leaves the function as plain Python"""
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(cache=True)
+def _spo2_kernel(red, ir):
+    """AC (peak-to-peak) and DC (mean) of both channels in a single pass"""
+    n = red.size
+    rmin = rmax = rsum = float(red[0])
+    imin = imax = isum = float(ir[0])
+    for i in range(1, n):
+        r = float(red[i])
+        v = float(ir[i])
+        rsum += r
+        isum += v
+        if r < rmin:
+            rmin = r
+        elif r > rmax:
+            rmax = r
+        if v < imin:
+            imin = v
+        elif v > imax:
+            imax = v
+    return rmax - rmin, rsum / n, imax - imin, isum / n
+
+
+@njit(cache=True)
+def _ms_peaks_kernel(x):
+    """Loop form of the modified Scholkmann scalogram, for Numba"""
+    n = x.size
+    scales = (n + 1) // 2 - 1
+    lsm = np.zeros((scales, n), dtype=np.bool_)
+    best_scale = 0
+    best_count = -1
+    for k in range(1, scales + 1):
+        count = 0
+        for i in range(k, n - k):
+            if x[i] > x[i - k] and x[i] > x[i + k]:
+                lsm[k - 1, i] = True
+                count += 1
+        # First scale with the most maxima, as argmax picks
+        if count > best_count:
+            best_count = count
+            best_scale = k - 1
+    
+    peaks = np.empty(n, dtype=np.intp)
+    found = 0
+    for i in range(1, n - 1):
+        for k in range(best_scale + 1):
+            if not lsm[k, i]:
+                break
+        else:
+            peaks[found] = i
+            found += 1
+    return peaks[:found]
+
 
 class MAX30102Sensor:
     """MAX30102 Pulse Oximeter and Heart Rate Sensor"""
     
-    def __init__(self, config: Dict):
-        """Initialize MAX30102 sensor"""
+    def __init__(self, config: Dict, simulate: bool = False):
+        """Initialize MAX30102 sensor (simulate=True skips the hardware)"""
         self.config = config
         self.sensor = None
-        self.simulation_mode = not HAS_MAX30102
+        self.simulation_mode = simulate or not HAS_MAX30102
+        
+        # Preallocated sample buffers, reused by every read. When the INT pin
+        # is wired they act as a ring filled by the FIFO interrupt callback
+        # and read() just snapshots the latest window
+        self.interrupt_mode = False
+        self._interrupt_since = None
+        self._int_pin = config.get('int_pin')
+        self._red = np.zeros(SAMPLES_PER_READ, dtype=np.uint32)
+        self._ir = np.zeros(SAMPLES_PER_READ, dtype=np.uint32)
+        # time.monotonic() of each sample, so heart rate follows real time
+        # rather than assuming exactly 100 samples per second
+        self._t = np.zeros(SAMPLES_PER_READ, dtype=np.float64)
+        self._sample_period = 1.0 / config.get('sample_rate', 100)
+        self._idx = 0
+        self._count = 0
+        self._fifo_lock = threading.Lock()
         
         if not self.simulation_mode:
             try:
@@ -67,8 +161,78 @@ class MAX30102Sensor:
                 logger.warning("Falling back to simulation mode")
                 self.simulation_mode = True
         
+        if not self.simulation_mode and self._int_pin is not None:
+            self._setup_fifo_interrupt()
+        
         if self.simulation_mode:
             logger.info("MAX30102 running in simulation mode")
+            self._rng = np.random.default_rng()
+            self._refill_simulation()
+        elif HAS_NUMBA:
+            # Compile the kernels now rather than on the first reading
+            self._calculate_heart_rate(self._ir, self._t)
+            self._calculate_spo2(self._red, self._ir)
+    
+    def _setup_fifo_interrupt(self):
+        """Drain the FIFO from a GPIO callback on the sensor's INT pin"""
+        if not HAS_GPIO:
+            logger.warning("GPIO library not available, MAX30102 falls back to polling")
+            return
+        
+        # Without the almost-full interrupt enabled INT never fires, and the
+        # ring would stay empty
+        enable_afull = getattr(self.sensor, 'enable_afull', None)
+        if enable_afull is None:
+            logger.warning("MAX30102 driver can't enable the FIFO interrupt, falling back to polling")
+            return
+        
+        try:
+            # Ask the sensor to pull INT low when its FIFO is almost full
+            enable_afull()
+            
+            GPIO.setmode(GPIO.BCM)
+            GPIO.setup(self._int_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+            GPIO.add_event_detect(self._int_pin, GPIO.FALLING, callback=self._on_fifo)
+            self.interrupt_mode = True
+            self._interrupt_since = time.monotonic()
+            logger.info(f"MAX30102 FIFO interrupt enabled on GPIO {self._int_pin}")
+            
+        except Exception as e:
+            logger.error(f"Failed to set up MAX30102 interrupt: {e}")
+            logger.warning("MAX30102 falls back to polling")
+    
+    def _on_fifo(self, channel):
+        """GPIO callback: move every buffered FIFO sample into the ring buffers"""
+        try:
+            with self._fifo_lock:
+                # A burst holds samples taken at the sensor's own rate, the
+                # last of them just now
+                now = time.monotonic()
+                pending = self.sensor.available()
+                for i in range(pending):
+                    self._red[self._idx] = self.sensor.pop_red_from_storage()
+                    self._ir[self._idx] = self.sensor.pop_ir_from_storage()
+                    self._t[self._idx] = now - (pending - 1 - i) * self._sample_period
+                    self._idx = (self._idx + 1) % SAMPLES_PER_READ
+                    if self._count < SAMPLES_PER_READ:
+                        self._count += 1
+        except Exception as e:
+            logger.error(f"Error draining MAX30102 FIFO: {e}")
+    
+    def _interrupt_stalled(self) -> bool:
+        """Whether no FIFO burst has arrived for longer than one read window"""
+        with self._fifo_lock:
+            last = self._t[self._idx - 1] if self._count else self._interrupt_since
+        return time.monotonic() - last > SAMPLES_PER_READ * self._sample_period
+    
+    def _snapshot(self):
+        """Latest window from the ring buffers, oldest sample first"""
+        with self._fifo_lock:
+            order = np.arange(self._idx - self._count, self._idx)
+            red = np.take(self._red, order, mode='wrap')
+            ir = np.take(self._ir, order, mode='wrap')
+            t = np.take(self._t, order, mode='wrap')
+        return red, ir, t
     
     def read(self) -> Optional[Dict[str, float]]:
         """
@@ -80,23 +244,33 @@ class MAX30102Sensor:
         if self.simulation_mode:
             return self._simulate_reading()
         
+        if self.interrupt_mode and self._interrupt_stalled():
+            logger.warning("No MAX30102 FIFO interrupt for a full read window, falling back to polling")
+            self.cleanup()
+        
         try:
-            # Read samples
-            samples = []
-            for _ in range(100):  # Collect 100 samples
-                if self.sensor.available():
-                    red_reading = self.sensor.pop_red_from_storage()
-                    ir_reading = self.sensor.pop_ir_from_storage()
-                    samples.append((red_reading, ir_reading))
-                time.sleep(0.01)
+            if self.interrupt_mode:
+                # Samples arrive via the FIFO interrupt; no polling needed
+                red, ir, t = self._snapshot()
+            else:
+                # Poll for samples, written in place into the instance buffers
+                count = 0
+                for _ in range(SAMPLES_PER_READ):
+                    if self.sensor.available():
+                        self._red[count] = self.sensor.pop_red_from_storage()
+                        self._ir[count] = self.sensor.pop_ir_from_storage()
+                        self._t[count] = time.monotonic()
+                        count += 1
+                    time.sleep(0.01)
+                red, ir, t = self._red[:count], self._ir[:count], self._t[:count]
             
-            if not samples:
+            if not ir.size:
                 logger.warning("No samples collected from MAX30102")
                 return None
             
             # Calculate heart rate and SpO2
-            heart_rate = self._calculate_heart_rate(samples)
-            spo2 = self._calculate_spo2(samples)
+            heart_rate = self._calculate_heart_rate(ir, t)
+            spo2 = self._calculate_spo2(red, ir)
             
             # Validate readings
             if heart_rate and 30 <= heart_rate <= 250:
@@ -113,49 +287,85 @@ class MAX30102Sensor:
             logger.error(f"Error reading MAX30102: {e}")
             return None
     
-    def _calculate_heart_rate(self, samples) -> Optional[float]:
-        """Calculate heart rate from IR samples using peak detection"""
-        if not samples:
-            return None
-        
-        # Extract IR values
-        ir_values = [ir for _, ir in samples]
-        
-        # Simple peak detection
-        threshold = sum(ir_values) / len(ir_values)
-        peaks = []
-        
-        for i in range(1, len(ir_values) - 1):
-            if ir_values[i] > threshold:
-                if ir_values[i] > ir_values[i-1] and ir_values[i] > ir_values[i+1]:
-                    peaks.append(i)
+    @staticmethod
+    def _detect_peaks_ms(signal) -> np.ndarray:
+        """
+        Find peaks with the modified Scholkmann algorithm (Bishop & Ercole)
+        
+        Builds the local maxima scalogram of the detrended signal: at scale
+        k, sample i is a maximum if it is larger than both samples k away,
+        for scales 1..ceil(n/2)-1 and only where both neighbours exist.
+        The scale with the most maxima (the row sum gamma, about half the
+        pulse period) is picked, and the peaks are the samples that are a
+        maximum at every scale up to it. This adapts to the pulse width
+        instead of relying on a fixed threshold, so noisy windows are
+        rejected less often. Cost is O(n * n/2) comparisons, 5000 for a
+        100-sample window.
+        
+        Args:
+            signal: 1-D array of samples
+            
+        Returns:
+            Indices of detected peaks, ascending
+        """
+        x = np.asarray(signal, dtype=np.float64)
+        n = x.size
+        scales = (n + 1) // 2 - 1
+        if scales < 1:
+            return np.empty(0, dtype=np.intp)
+        
+        # Remove baseline drift so slow trends don't mask maxima
+        t = np.arange(n)
+        x = x - np.polyval(np.polyfit(t, x, 1), t)
+        
+        if HAS_NUMBA:
+            return _ms_peaks_kernel(x)
+        
+        # Scalogram: True where sample i is larger than both its neighbours
+        # k away; samples within k of either end have no row entry
+        lsm = np.zeros((scales, n), dtype=np.bool_)
+        for k in range(1, scales + 1):
+            middle = x[k:n - k]
+            lsm[k - 1, k:n - k] = (middle > x[:n - 2 * k]) & (middle > x[2 * k:])
+        
+        # Scale with the most maxima; peaks are the samples that are maxima
+        # at every scale up to it
+        best_scale = int(np.argmax(lsm.sum(axis=1)))
+        return np.flatnonzero(lsm[:best_scale + 1].all(axis=0))
+    
+    def _calculate_heart_rate(self, ir_values, timestamps) -> Optional[float]:
+        """Calculate heart rate from IR samples and their monotonic timestamps"""
+        peaks = self._detect_peaks_ms(ir_values)
         
-        if len(peaks) < 2:
+        if peaks.size < 2:
             return None
         
-        # Calculate average time between peaks
-        peak_intervals = [peaks[i+1] - peaks[i] for i in range(len(peaks)-1)]
-        avg_interval = sum(peak_intervals) / len(peak_intervals)
+        # Average time between peaks, in seconds
+        avg_interval = (timestamps[peaks[-1]] - timestamps[peaks[0]]) / (peaks.size - 1)
+        if avg_interval <= 0:
+            return None
         
-        # Convert to BPM (100 samples = ~1 second)
-        heart_rate = 60 / (avg_interval * 0.01)
+        # Convert to BPM
+        heart_rate = float(60 / avg_interval)
         
         return heart_rate if 30 <= heart_rate <= 250 else None
     
-    def _calculate_spo2(self, samples) -> Optional[float]:
+    def _calculate_spo2(self, red_values, ir_values) -> Optional[float]:
         """Calculate SpO2 from red and IR samples"""
-        if not samples:
+        red = np.asarray(red_values)
+        ir = np.asarray(ir_values)
+        if not red.size or not ir.size:
             return None
         
-        # Extract values
-        red_values = [red for red, _ in samples]
-        ir_values = [ir for _, ir in samples]
-        
-        # Calculate AC and DC components
-        red_ac = max(red_values) - min(red_values)
-        red_dc = sum(red_values) / len(red_values)
-        ir_ac = max(ir_values) - min(ir_values)
-        ir_dc = sum(ir_values) / len(ir_values)
+        # Calculate AC and DC components; without Numba the kernel is a
+        # plain Python loop, slower than NumPy's reductions
+        if HAS_NUMBA:
+            red_ac, red_dc, ir_ac, ir_dc = _spo2_kernel(red, ir)
+        else:
+            red_ac = np.ptp(red)
+            red_dc = red.mean()
+            ir_ac = np.ptp(ir)
+            ir_dc = ir.mean()
         
         # Avoid division by zero
         if red_dc == 0 or ir_dc == 0 or ir_ac == 0:
@@ -165,58 +375,121 @@ class MAX30102Sensor:
         r = (red_ac / red_dc) / (ir_ac / ir_dc)
         
         # Empirical formula for SpO2
-        spo2 = 110 - 25 * r
+        spo2 = float(110 - 25 * r)
         
         return spo2 if 70 <= spo2 <= 100 else None
     
+    def cleanup(self):
+        """Stop the FIFO interrupt callback"""
+        if self.interrupt_mode:
+            GPIO.remove_event_detect(self._int_pin)
+            self.interrupt_mode = False
+    
+    def _refill_simulation(self):
+        """Draw the next batch of simulated values"""
+        # Generate realistic simulated values with some variation
+        self._sim_hr = 75 + self._rng.integers(-5, 6, size=SIM_BATCH)
+        self._sim_spo2 = 97 + self._rng.integers(-2, 3, size=SIM_BATCH)
+        self._sim_idx = 0
+    
     def _simulate_reading(self) -> Dict[str, float]:
         """Simulate sensor readings for testing"""
-        # Generate realistic simulated values with some variation
-        base_hr = 75
-        base_spo2 = 97
-        
-        heart_rate = base_hr + random.randint(-5, 5)
-        spo2 = base_spo2 + random.randint(-2, 2)
+        if self._sim_idx == SIM_BATCH:
+            self._refill_simulation()
+        i = self._sim_idx
+        self._sim_idx += 1
         
         return {
-            'heart_rate': heart_rate,
-            'spo2': spo2
+            'heart_rate': int(self._sim_hr[i]),
+            'spo2': int(self._sim_spo2[i])
         }
 
 
 class DS18B20Sensor:
     """DS18B20 Digital Temperature Sensor"""
     
-    def __init__(self, config: Dict):
-        """Initialize DS18B20 sensor"""
+    def __init__(self, config: Dict, simulate: bool = False):
+        """Initialize DS18B20 sensor (simulate=True skips the hardware)"""
         self.config = config
         self.sensor = None
-        self.simulation_mode = not HAS_DS18B20
+        self.simulation_mode = simulate or not HAS_DS18B20
+        self.resolution = 12
+        self._last_attempt = None
+        self._attempts = 0
+        self._max_attempts = config.get('init_retries', DS18B20_INIT_RETRIES)
         
         if not self.simulation_mode:
-            try:
-                # Initialize 1-Wire sensor
-                self.sensor = W1ThermSensor()
-                logger.info(f"DS18B20 sensor initialized: {self.sensor.id}")
-                
-            except Exception as e:
-                logger.error(f"Failed to initialize DS18B20: {e}")
+            # At boot the 1-Wire driver may not have found the sensor yet;
+            # read() keeps retrying for a while before giving up on the
+            # hardware
+            self._ensure_sensor()
+        else:
+            self._start_simulation()
+    
+    def _start_simulation(self):
+        """Switch to simulated readings"""
+        logger.info("DS18B20 running in simulation mode")
+        self.simulation_mode = True
+        self._rng = np.random.default_rng()
+        self._refill_simulation()
+    
+    def _ensure_sensor(self) -> bool:
+        """
+        Open the 1-Wire sensor if needed, at most once per retry interval
+        
+        After init_retries failed attempts the sensor is taken to be
+        missing and the driver falls back to simulation mode.
+        """
+        if self.sensor is not None:
+            return True
+        
+        now = time.monotonic()
+        if self._last_attempt is not None and now - self._last_attempt < DS18B20_RETRY_INTERVAL:
+            return False
+        self._last_attempt = now
+        self._attempts += 1
+        
+        try:
+            # Initialize 1-Wire sensor
+            self.sensor = W1ThermSensor()
+        except Exception as e:
+            if self._attempts >= self._max_attempts:
+                logger.error(f"DS18B20 not found after {self._attempts} attempts: {e}")
                 logger.warning("Falling back to simulation mode")
-                self.simulation_mode = True
+                self._start_simulation()
+            else:
+                logger.warning(f"DS18B20 not available yet, retrying in {DS18B20_RETRY_INTERVAL}s: {e}")
+            return False
         
-        if self.simulation_mode:
-            logger.info("DS18B20 running in simulation mode")
+        logger.info(f"DS18B20 sensor initialized: {self.sensor.id}")
+        
+        # Conversion time doubles with every extra bit: 9-bit takes
+        # ~94ms against ~750ms at the 12-bit default, at the cost of
+        # reporting temperature in 0.5°C steps
+        self.resolution = self.config.get('resolution', 9)
+        try:
+            self.sensor.set_resolution(self.resolution, persist=False)
+        except Exception as e:
+            logger.warning(f"Could not set DS18B20 resolution: {e}")
+            self.resolution = 12
+        
+        return True
     
     def read(self) -> Optional[Dict[str, float]]:
         """
         Read temperature value
         
         Returns:
-            Dict with 'temperature' and 'temperature_unit' keys
+            Dict with 'temperature' and 'temperature_unit' keys, or None if
+            the sensor isn't available or the reading is invalid
         """
         if self.simulation_mode:
             return self._simulate_reading()
         
+        if not self._ensure_sensor():
+            # Either still waiting for the driver, or just given up on it
+            return self._simulate_reading() if self.simulation_mode else None
+        
         try:
             # Read temperature in Celsius
             temp_celsius = self.sensor.get_temperature()
@@ -227,6 +500,9 @@ class DS18B20Sensor:
             
             # Validate reading
             if 30.0 <= temp_celsius <= 42.0:  # Valid body temperature range
+                if self.resolution == 9:
+                    # Don't report more precision than the sensor delivers
+                    temp_celsius = round(temp_celsius * 2) / 2
                 return {
                     'temperature': round(temp_celsius, 1),
                     'temperature_unit': 'C'
@@ -239,24 +515,50 @@ class DS18B20Sensor:
             logger.error(f"Error reading DS18B20: {e}")
             return None
     
+    def _refill_simulation(self):
+        """Draw the next batch of simulated temperatures"""
+        self._sim_temp = np.round(36.8 + self._rng.uniform(-0.3, 0.3, size=SIM_BATCH), 1)
+        self._sim_idx = 0
+    
     def _simulate_reading(self) -> Dict[str, float]:
         """Simulate temperature reading for testing"""
-        base_temp = 36.8
-        temperature = base_temp + random.uniform(-0.3, 0.3)
+        if self._sim_idx == SIM_BATCH:
+            self._refill_simulation()
+        temperature = float(self._sim_temp[self._sim_idx])
+        self._sim_idx += 1
         
         return {
-            'temperature': round(temperature, 1),
+            'temperature': temperature,
             'temperature_unit': 'C'
         }
 
 
+# (red, green, blue) pin levels for each LED color
+_LED_COLORS = {
+    'off': (0, 0, 0),
+    'red': (1, 0, 0),
+    'green': (0, 1, 0),
+    'blue': (0, 0, 1),
+    'yellow': (1, 1, 0),
+    'cyan': (0, 1, 1),
+    'magenta': (1, 0, 1),
+    'white': (1, 1, 1)
+}
+
+
 class StatusIndicators:
     """LED and Buzzer status indicators"""
     
-    def __init__(self, config: Dict):
-        """Initialize GPIO pins for indicators"""
+    def __init__(self, config: Dict, simulate: bool = False):
+        """Initialize GPIO pins for indicators (simulate=True skips the hardware)"""
         self.config = config
-        self.simulation_mode = not HAS_GPIO
+        self.simulation_mode = simulate or not HAS_GPIO
+        self._last_color = None
+        self._pwm = None
+        self._beep_thread = None
+        self._beep_stop = threading.Event()
+        self._beep_count = 0
+        self._beep_lock = threading.Lock()
         
         if not self.simulation_mode:
             try:
@@ -271,6 +573,7 @@ class StatusIndicators:
                 GPIO.setup(self.led_red, GPIO.OUT)
                 GPIO.setup(self.led_green, GPIO.OUT)
                 GPIO.setup(self.led_blue, GPIO.OUT)
+                self._pins = (self.led_red, self.led_green, self.led_blue)
                 
                 # Setup buzzer pin
                 self.buzzer = config.get('buzzer_pin', 17)
@@ -280,6 +583,10 @@ class StatusIndicators:
                 self.set_led('off')
                 GPIO.output(self.buzzer, GPIO.LOW)
                 
+                # The buzzer is driven by PWM at 0% duty (silent) until a beep
+                self._pwm = GPIO.PWM(self.buzzer, config.get('buzzer_frequency', 2000))
+                self._pwm.start(0)
+                
                 logger.info("Status indicators initialized")
                 
             except Exception as e:
@@ -292,43 +599,67 @@ class StatusIndicators:
     
     def set_led(self, color: str):
         """Set LED color (red, green, blue, yellow, cyan, magenta, white, off)"""
+        # The LEDs are set every reading, usually to the color they already show
+        if color == self._last_color or color not in _LED_COLORS:
+            return
+        self._last_color = color
+        
         if self.simulation_mode:
             logger.debug(f"[SIM] LED color: {color}")
             return
         
-        colors = {
-            'off': (0, 0, 0),
-            'red': (1, 0, 0),
-            'green': (0, 1, 0),
-            'blue': (0, 0, 1),
-            'yellow': (1, 1, 0),
-            'cyan': (0, 1, 1),
-            'magenta': (1, 0, 1),
-            'white': (1, 1, 1)
-        }
-        
-        if color in colors:
-            r, g, b = colors[color]
-            GPIO.output(self.led_red, r)
-            GPIO.output(self.led_green, g)
-            GPIO.output(self.led_blue, b)
+        # One call drives all three channels
+        GPIO.output(self._pins, _LED_COLORS[color])
     
     def beep(self, duration: float = 0.2, count: int = 1):
-        """Sound buzzer"""
+        """
+        Sound buzzer on a background thread; returns immediately
+        
+        A pattern that is still playing finishes first, unless the new one
+        has more beeps (alerts beep more the more severe they are), in which
+        case it is cut short so e.g. a critical alert isn't lost behind a
+        warning.
+        """
         if self.simulation_mode:
             logger.debug(f"[SIM] Buzzer: {count} beep(s)")
             return
         
-        for _ in range(count):
-            GPIO.output(self.buzzer, GPIO.HIGH)
-            time.sleep(duration)
-            GPIO.output(self.buzzer, GPIO.LOW)
-            time.sleep(duration)
+        with self._beep_lock:
+            if self._beep_thread and self._beep_thread.is_alive():
+                if count <= self._beep_count:
+                    return
+                self._beep_stop.set()
+                self._beep_thread.join()
+            
+            self._beep_stop = threading.Event()
+            self._beep_count = count
+            self._beep_thread = threading.Thread(
+                target=self._beep_worker, args=(duration, count, self._beep_stop),
+                name='buzzer', daemon=True
+            )
+            self._beep_thread.start()
+    
+    def _beep_worker(self, duration: float, count: int, stop: threading.Event):
+        """Play count beeps by switching the PWM duty cycle, until stop is set"""
+        try:
+            for _ in range(count):
+                self._pwm.ChangeDutyCycle(50)
+                stopped = stop.wait(duration)
+                self._pwm.ChangeDutyCycle(0)
+                if stopped or stop.wait(duration):
+                    break
+        except Exception as e:
+            logger.error(f"Buzzer error: {e}")
     
     def cleanup(self):
         """Cleanup GPIO"""
         if not self.simulation_mode:
+            if self._beep_thread:
+                self._beep_stop.set()
+                self._beep_thread.join()
+            self._pwm.stop()
             GPIO.cleanup()
+        self._last_color = None
 
 
 class SensorManager:
@@ -338,21 +669,63 @@ class SensorManager:
         """Initialize all sensors"""
         self.config = config
         
+        # simulate: true skips probing I2C, 1-Wire and GPIO entirely
+        simulate = config.get('simulate', False)
+        
         # Initialize sensors
-        self.max30102 = MAX30102Sensor(config.get('max30102', {}))
-        self.ds18b20 = DS18B20Sensor(config.get('ds18b20', {}))
-        self.indicators = StatusIndicators(config.get('indicators', {}))
+        self.max30102 = MAX30102Sensor(config.get('max30102', {}), simulate)
+        self.ds18b20 = DS18B20Sensor(config.get('ds18b20', {}), simulate)
+        self.indicators = StatusIndicators(config.get('indicators', {}), simulate)
+        
+        # Sensors sit on independent buses (I2C, 1-Wire) and are read in
+        # parallel so a tick costs the slowest sensor, not the sum
+        self._sensors = {
+            'max30102': self.max30102,
+            'ds18b20': self.ds18b20
+        }
+        self.read_timeout = config.get('read_timeout', 5.0)
+        
+        # Simulated reads just index a pregenerated batch, far cheaper than
+        # a thread handoff, so they run inline
+        self._all_simulated = all(sensor.simulation_mode for sensor in self._sensors.values())
+        self._pool = ThreadPoolExecutor(
+            max_workers=len(self._sensors),
+            thread_name_prefix='sensor'
+        )
         
         logger.info("Sensor manager initialized")
     
-    def read_all(self) -> Optional[Dict]:
-        """Read all sensors and return combined data"""
+    def _read_parallel(self) -> Dict[str, Optional[Dict]]:
+        """Read every sensor concurrently; failed reads map to None"""
+        if self._all_simulated:
+            return {name: sensor.read() for name, sensor in self._sensors.items()}
+        
+        futures = {
+            name: self._pool.submit(sensor.read)
+            for name, sensor in self._sensors.items()
+        }
+        
+        results = {}
+        deadline = time.monotonic() + self.read_timeout
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except FuturesTimeoutError:
+                logger.error(f"Timed out reading {name}")
+                results[name] = None
+            except Exception as e:
+                logger.error(f"Error reading {name}: {e}")
+                results[name] = None
+        
+        return results
+    
+    def read_all(self, update_led: bool = True) -> Optional[Dict]:
+        """Read all sensors and return combined data (update_led=False leaves the status LED alone)"""
         try:
-            # Read heart rate and SpO2
-            pulse_ox_data = self.max30102.read()
-            
-            # Read temperature
-            temp_data = self.ds18b20.read()
+            # Read heart rate/SpO2 and temperature at the same time
+            results = self._read_parallel()
+            pulse_ox_data = results['max30102']
+            temp_data = results['ds18b20']
             
             # Combine data
             if pulse_ox_data and temp_data:
@@ -360,22 +733,27 @@ class SensorManager:
                 readings['timestamp'] = time.time()
                 
                 # Update status LED (green = normal)
-                self.indicators.set_led('green')
+                if update_led:
+                    self.indicators.set_led('green')
                 
                 return readings
             else:
                 logger.warning("Failed to read one or more sensors")
-                self.indicators.set_led('red')
+                if update_led:
+                    self.indicators.set_led('red')
                 return None
                 
         except Exception as e:
             logger.error(f"Error reading sensors: {e}")
-            self.indicators.set_led('red')
+            if update_led:
+                self.indicators.set_led('red')
             return None
     
     def cleanup(self):
         """Cleanup all sensors"""
         logger.info("Cleaning up sensors")
+        self._pool.shutdown(wait=False)
+        self.max30102.cleanup()
         self.indicators.cleanup()
 
 
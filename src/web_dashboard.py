@@ -3,33 +3,269 @@ Web Dashboard Module
 Flask-based web interface for real-time monitoring
 """
 
+import json
+import time
+import gzip
+import hashlib
 import logging
-from flask import Flask, render_template_string, jsonify, request
+import threading
+import numpy as np
+from typing import Dict
+from flask import Flask, Response, jsonify, request
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Readings fields that trigger a push on /api/stream when they change
+_STREAM_FIELDS = ('heart_rate', 'spo2', 'temperature')
+
+# Seconds between keepalive comments on an idle /api/stream
+_STREAM_KEEPALIVE = 15
+
+try:
+    from waitress import serve
+    HAS_WAITRESS = True
+except ImportError:
+    HAS_WAITRESS = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _dumps(obj) -> bytes:
+    """Serialize to JSON bytes, with orjson (NumPy-aware) when installed"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+def _soa_history(records: np.ndarray) -> Dict:
+    """
+    Readings as parallel columns instead of one object per row
+    
+    Field names appear once rather than in every row, which makes 1000-row
+    history responses several times smaller. Timestamps are Unix seconds
+    (UTC); missing values are null.
+    """
+    def column(values):
+        return np.where(np.isnan(values), None, values).tolist()
+    
+    return {
+        't': records['timestamp'].astype(np.int64).tolist(),
+        'hr': column(records['heart_rate']),
+        'spo2': column(records['spo2']),
+        'temp': column(records['temperature'])
+    }
+
+
+class _ResponseCache:
+    """
+    Serialized JSON responses kept for a short TTL
+    
+    The dashboard polls the same history/alerts/statistics windows over and
+    over; caching the encoded body and its ETag saves both the database
+    query and the re-serialization, and lets clients revalidate with 304s.
+    """
+    
+    def __init__(self, ttl: float, maxsize: int = 16):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key, build):
+        """Return (body, etag) for key, calling build() for a fresh payload when stale"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1], entry[2]
+        
+        body = _dumps(build())
+        etag = hashlib.md5(body, usedforsecurity=False).hexdigest()
+        
+        with self._lock:
+            if len(self._entries) >= self.maxsize:
+                # Evict expired entries first, then the one closest to expiry
+                self._entries = {k: e for k, e in self._entries.items() if e[0] > now}
+                if len(self._entries) >= self.maxsize:
+                    del self._entries[min(self._entries, key=lambda k: self._entries[k][0])]
+            self._entries[key] = (now + self.ttl, body, etag)
+        return body, etag
+
+
+class _Sampler:
+    """
+    Read sensors on a background thread and keep the latest snapshot
+    
+    A MAX30102 read takes about a second, so requests serve the snapshot
+    in `latest` instead of reading the sensors themselves. While nobody is
+    watching (no open /api/stream and no recent /api/current poll) the
+    sampler drops to idle_interval and turns the status LED off.
+    """
+    
+    def __init__(self, sensor_manager, interval: float, idle_interval: float, max_subscribers: int = 4):
+        self.sensor_manager = sensor_manager
+        self.interval = interval
+        self.idle_interval = idle_interval
+        self.max_subscribers = max_subscribers
+        self.latest = None
+        
+        # Set once the first reading is available
+        self.ready = threading.Event()
+        # Notified after every new reading; seq only changes under it, so a
+        # reading that lands between a check and wait() is never missed
+        self.new_reading = threading.Condition()
+        self.seq = 0
+        
+        self.subscribers = 0
+        self._last_poll = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+    
+    def start(self):
+        """Start the sampling thread"""
+        threading.Thread(target=self._sample_loop, name='dashboard-sampler', daemon=True).start()
+    
+    def stop(self):
+        """Stop the sampling thread after its current read"""
+        self._stopped.set()
+        self._wake.set()
+    
+    def subscribe(self) -> bool:
+        """
+        Register an open stream; the sampler stays at full rate until it closes
+        
+        Each stream holds a server thread for as long as it is open, so at
+        most max_subscribers are accepted to leave threads for the API.
+        
+        Returns:
+            False if the stream limit is reached
+        """
+        with self._lock:
+            if self.subscribers >= self.max_subscribers:
+                return False
+            self.subscribers += 1
+        self._wake.set()
+        return True
+    
+    def unsubscribe(self):
+        """Unregister a closed stream"""
+        with self._lock:
+            self.subscribers -= 1
+    
+    def poll(self):
+        """Note a polling client, waking the sampler if it was idle"""
+        idle = not self.active()
+        self._last_poll = time.monotonic()
+        if idle:
+            self._wake.set()
+    
+    def active(self) -> bool:
+        """Whether any client is currently watching"""
+        if self.subscribers > 0:
+            return True
+        return self._last_poll is not None and time.monotonic() - self._last_poll < self.idle_interval
+    
+    def wait_for_reading(self, seq: int, timeout: float):
+        """
+        Wait until a reading newer than seq arrives
+        
+        Returns:
+            (seq, readings) of the latest reading, or None on timeout
+        """
+        with self.new_reading:
+            if not self.new_reading.wait_for(lambda: self.seq != seq, timeout):
+                return None
+            return self.seq, self.latest
+    
+    def _sample_loop(self):
+        was_active = True
+        while not self._stopped.is_set():
+            active = self.active()
+            try:
+                if was_active and not active:
+                    # Switched off once on going idle; idle reads leave it off
+                    self.sensor_manager.indicators.set_led('off')
+                was_active = active
+                
+                readings = self.sensor_manager.read_all(update_led=active)
+                if readings:
+                    with self.new_reading:
+                        # Swapping in a new dict is atomic; readers never see
+                        # a partially updated snapshot
+                        self.latest = readings
+                        self.seq += 1
+                        self.new_reading.notify_all()
+                    self.ready.set()
+            except Exception as e:
+                logger.error(f"Sampler error: {e}")
+            
+            self._wake.wait(self.interval if active else self.idle_interval)
+            self._wake.clear()
+
 
 def create_app(monitor):
     """Create Flask application"""
     app = Flask(__name__)
     app.config['monitor'] = monitor
     
+    dashboard_config = monitor.config.get('web_dashboard', {})
+    sampler = _Sampler(
+        monitor.sensor_manager,
+        dashboard_config.get('sample_interval', 1),
+        dashboard_config.get('idle_sample_interval', 30),
+        dashboard_config.get('max_streams', 4)
+    )
+    app.config['sampler'] = sampler
+    sampler.start()
+    cache = _ResponseCache(dashboard_config.get('cache_ttl', 5))
+    
+    def cached_json(key, build):
+        """JSON response for key from the cache, or 304 if the client's copy is current"""
+        body, etag = cache.get(key, build)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        return response
+    
     @app.route('/')
     def index():
-        """Main dashboard page"""
-        return render_template_string(HTML_TEMPLATE)
+        """Main dashboard page, served from the bytes encoded at import"""
+        use_gzip = 'gzip' in request.accept_encodings
+        body, etag = (_INDEX_GZIP, _INDEX_GZIP_ETAG) if use_gzip else (_INDEX_HTML, _INDEX_ETAG)
+        
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype='text/html')
+            if use_gzip:
+                response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.max_age = 3600
+        return response
     
     @app.route('/api/current')
     def get_current():
-        """Get current readings"""
+        """Get current readings from the background sampler"""
         try:
-            readings = monitor.sensor_manager.read_all()
+            sampler.poll()
+            # Only the first requests after startup wait for a reading
+            sampler.ready.wait(timeout=5)
+            readings = sampler.latest
             if readings:
-                return jsonify({
+                return Response(_dumps({
                     'success': True,
                     'data': readings
-                })
+                }), mimetype='application/json')
             else:
                 return jsonify({
                     'success': False,
@@ -42,22 +278,71 @@ def create_app(monitor):
                 'error': str(e)
             }), 500
     
+    @app.route('/api/stream')
+    def stream():
+        """Server-sent events carrying the latest readings whenever they change"""
+        if not sampler.subscribe():
+            # The page falls back to polling /api/current
+            response = jsonify({
+                'success': False,
+                'error': 'Too many open streams'
+            })
+            response.status_code = 503
+            response.headers['Retry-After'] = str(_STREAM_KEEPALIVE)
+            return response
+        
+        def events():
+            with sampler.new_reading:
+                seq, readings = sampler.seq, sampler.latest
+            last_sent = None
+            while True:
+                vitals = readings and tuple(readings.get(k) for k in _STREAM_FIELDS)
+                if vitals and vitals != last_sent:
+                    last_sent = vitals
+                    yield b'data: ' + _dumps(readings) + b'\n\n'
+                
+                # Never yield while holding the condition: writing to a slow
+                # client would stall the sampler
+                update = sampler.wait_for_reading(seq, _STREAM_KEEPALIVE)
+                if update is None:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield b': keepalive\n\n'
+                else:
+                    seq, readings = update
+        
+        response = Response(events(), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        # Runs when the server closes the response on disconnect, even if
+        # the generator never started
+        response.call_on_close(sampler.unsubscribe)
+        return response
+    
     @app.route('/api/history')
     def get_history():
-        """Get historical data"""
+        """Get historical data, as rows or with ?format=soa as parallel columns"""
         try:
             hours = int(request.args.get('hours', 24))
-            start_date = datetime.now() - timedelta(hours=hours)
+            soa = request.args.get('format') == 'soa'
             
-            readings = monitor.data_handler.get_readings(
-                start_date=start_date,
-                limit=1000
-            )
+            def build():
+                start_date = datetime.now() - timedelta(hours=hours)
+                if soa:
+                    readings = _soa_history(monitor.data_handler.get_readings_array(
+                        start_date=start_date,
+                        limit=1000
+                    ))
+                else:
+                    readings = monitor.data_handler.get_readings(
+                        start_date=start_date,
+                        limit=1000
+                    )
+                return {
+                    'success': True,
+                    'data': readings
+                }
             
-            return jsonify({
-                'success': True,
-                'data': readings
-            })
+            return cached_json(('history', hours, soa), build)
         except Exception as e:
             logger.error(f"API error: {e}")
             return jsonify({
@@ -70,17 +355,19 @@ def create_app(monitor):
         """Get recent alerts"""
         try:
             hours = int(request.args.get('hours', 24))
-            start_date = datetime.now() - timedelta(hours=hours)
             
-            alerts = monitor.data_handler.get_alerts(
-                start_date=start_date,
-                limit=100
-            )
+            def build():
+                start_date = datetime.now() - timedelta(hours=hours)
+                alerts = monitor.data_handler.get_alerts(
+                    start_date=start_date,
+                    limit=100
+                )
+                return {
+                    'success': True,
+                    'data': alerts
+                }
             
-            return jsonify({
-                'success': True,
-                'data': alerts
-            })
+            return cached_json(('alerts', hours), build)
         except Exception as e:
             logger.error(f"API error: {e}")
             return jsonify({
@@ -90,17 +377,24 @@ def create_app(monitor):
     
     @app.route('/api/statistics')
     def get_statistics():
-        """Get statistics"""
+        """Get statistics over the last N hours, or the last N readings with ?recent=N"""
         try:
+            recent = request.args.get('recent')
+            recent = int(recent) if recent is not None else None
             hours = int(request.args.get('hours', 24))
-            start_date = datetime.now() - timedelta(hours=hours)
             
-            stats = monitor.data_handler.get_statistics(start_date=start_date)
+            def build():
+                if recent is not None:
+                    stats = monitor.data_handler.get_recent_stats(recent)
+                else:
+                    start_date = datetime.now() - timedelta(hours=hours)
+                    stats = monitor.data_handler.get_statistics(start_date=start_date)
+                return {
+                    'success': True,
+                    'data': stats
+                }
             
-            return jsonify({
-                'success': True,
-                'data': stats
-            })
+            return cached_json(('statistics', recent, hours), build)
         except Exception as e:
             logger.error(f"API error: {e}")
             return jsonify({
@@ -111,6 +405,23 @@ def create_app(monitor):
     return app
 
 
+def run(app, host: str, port: int, threads: int = 8, debug: bool = False):
+    """
+    Serve the dashboard with a threaded WSGI server
+    
+    Uses Waitress when installed so concurrent polls from several tabs don't
+    queue behind each other; otherwise (or in debug mode) falls back to the
+    Flask development server with threading enabled.
+    """
+    if HAS_WAITRESS and not debug:
+        logger.info(f"Serving dashboard with Waitress ({threads} threads)")
+        serve(app, host=host, port=port, threads=threads)
+    else:
+        if not debug:
+            logger.warning("Waitress not available, using the Flask development server")
+        app.run(host=host, port=port, debug=debug, threaded=True)
+
+
 # HTML Template for dashboard
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -313,40 +624,43 @@ HTML_TEMPLATE = """
                 const result = await response.json();
                 
                 if (result.success) {
-                    const data = result.data;
-                    
-                    // Update heart rate
-                    if (data.heart_rate) {
-                        document.getElementById('heart-rate').innerHTML = 
-                            data.heart_rate + '<span class="unit">bpm</span>';
-                        updateStatus('hr', data.heart_rate, 60, 100, 40, 150);
-                    }
-                    
-                    // Update SpO2
-                    if (data.spo2) {
-                        document.getElementById('spo2').innerHTML = 
-                            data.spo2 + '<span class="unit">%</span>';
-                        updateStatus('spo2', data.spo2, 95, 100, 90, 100);
-                    }
-                    
-                    // Update temperature
-                    if (data.temperature) {
-                        document.getElementById('temperature').innerHTML = 
-                            data.temperature.toFixed(1) + '<span class="unit">°C</span>';
-                        updateStatus('temp', data.temperature, 36.1, 37.8, 35.0, 39.0);
-                    }
-                    
-                    // Update timestamp
-                    const now = new Date().toLocaleTimeString();
-                    document.getElementById('hr-time').textContent = 'Updated: ' + now;
-                    document.getElementById('spo2-time').textContent = 'Updated: ' + now;
-                    document.getElementById('temp-time').textContent = 'Updated: ' + now;
+                    renderReadings(result.data);
                 }
             } catch (error) {
                 console.error('Error fetching readings:', error);
             }
         }
         
+        // Show a set of readings
+        function renderReadings(data) {
+            // Update heart rate
+            if (data.heart_rate) {
+                document.getElementById('heart-rate').innerHTML = 
+                    data.heart_rate + '<span class="unit">bpm</span>';
+                updateStatus('hr', data.heart_rate, 60, 100, 40, 150);
+            }
+            
+            // Update SpO2
+            if (data.spo2) {
+                document.getElementById('spo2').innerHTML = 
+                    data.spo2 + '<span class="unit">%</span>';
+                updateStatus('spo2', data.spo2, 95, 100, 90, 100);
+            }
+            
+            // Update temperature
+            if (data.temperature) {
+                document.getElementById('temperature').innerHTML = 
+                    data.temperature.toFixed(1) + '<span class="unit">°C</span>';
+                updateStatus('temp', data.temperature, 36.1, 37.8, 35.0, 39.0);
+            }
+            
+            // Update timestamp
+            const now = new Date().toLocaleTimeString();
+            document.getElementById('hr-time').textContent = 'Updated: ' + now;
+            document.getElementById('spo2-time').textContent = 'Updated: ' + now;
+            document.getElementById('temp-time').textContent = 'Updated: ' + now;
+        }
+        
         // Update status indicator
         function updateStatus(prefix, value, min, max, criticalMin, criticalMax) {
             const statusEl = document.getElementById(prefix + '-status');
@@ -398,10 +712,29 @@ HTML_TEMPLATE = """
         updateReadings();
         updateAlerts();
         
-        // Set up auto-refresh
-        setInterval(updateReadings, UPDATE_INTERVAL);
+        // Readings are pushed by the server when they change; poll only
+        // where server-sent events aren't supported
+        if (window.EventSource) {
+            const source = new EventSource('/api/stream');
+            source.onmessage = event => renderReadings(JSON.parse(event.data));
+            source.onerror = () => {
+                // Refused (stream limit reached) or dropped for good
+                if (source.readyState === EventSource.CLOSED) {
+                    setInterval(updateReadings, UPDATE_INTERVAL);
+                }
+            };
+        } else {
+            setInterval(updateReadings, UPDATE_INTERVAL);
+        }
         setInterval(updateAlerts, UPDATE_INTERVAL * 5);
     </script>
 </body>
 </html>
 """
+
+# The template has no variables, so encode and compress it once instead of
+# rendering it through Jinja on every request
+_INDEX_HTML = HTML_TEMPLATE.encode('utf-8')
+_INDEX_GZIP = gzip.compress(_INDEX_HTML, 6)
+_INDEX_ETAG = hashlib.md5(_INDEX_HTML, usedforsecurity=False).hexdigest()
+_INDEX_GZIP_ETAG = _INDEX_ETAG + '-gzip'
@@ -0,0 +1,128 @@
+"""
+Shared pytest fixtures for EdgePulse-Pi5
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Make the src package importable however pytest is invoked
+ROOT = str(Path(__file__).resolve().parent.parent)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Modules under test are imported inside the fixtures, so running a subset
+# (e.g. -k analyzer) only pays for the modules it uses
+
+
+@pytest.fixture(scope="session")
+def _db():
+    """One in-memory DataHandler for the whole session, schema created once"""
+    from src.data_handler import DataHandler
+    
+    handler = DataHandler(":memory:")
+    yield handler
+    handler.close()
+
+
+@pytest.fixture
+def handler(_db):
+    """The session DataHandler, emptied after each test"""
+    yield _db
+    
+    # Write out any buffered readings first so they are deleted too
+    _db.flush()
+    _db.conn.executescript("DELETE FROM readings; DELETE FROM alerts;")
+
+
+@pytest.fixture
+def local_tz(monkeypatch):
+    """Run with a local time zone well away from UTC"""
+    import time
+    
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.fixture(scope="session")
+def main_module(tmp_path_factory):
+    """main.py, imported from a scratch directory that has the logs/ it writes to"""
+    import importlib
+    import logging
+    import os
+    
+    workdir = tmp_path_factory.mktemp("main")
+    (workdir / "logs").mkdir()
+    
+    # Keep main's logging.basicConfig from leaving handlers on the root logger
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        module = importlib.import_module("main")
+    finally:
+        os.chdir(cwd)
+        for h in root.handlers[len(handlers):]:
+            root.removeHandler(h)
+            h.close()
+        root.setLevel(level)
+    return module
+
+
+@pytest.fixture(scope="module")
+def _module_analyzer(request):
+    """One analyzer per test module, built from that module's THRESHOLDS"""
+    from src.analyzer import VitalSignsAnalyzer
+    
+    return VitalSignsAnalyzer(request.module.THRESHOLDS)
+
+
+@pytest.fixture
+def analyzer(_module_analyzer):
+    """The module's analyzer with history and alert cooldowns cleared"""
+    _module_analyzer.reset_history()
+    return _module_analyzer
+
+
+# Sensors config that forces simulation mode, without probing any hardware
+SIM_SENSORS_CONFIG = {
+    'simulate': True,
+    'max30102': {'red_led_current': 24, 'ir_led_current': 24},
+    'ds18b20': {'calibration_offset': 0.0},
+    'indicators': {}
+}
+
+
+@pytest.fixture(scope="module")
+def sim_sensor_manager():
+    """SensorManager forced into simulation mode"""
+    from src.sensors import SensorManager
+    
+    manager = SensorManager(SIM_SENSORS_CONFIG)
+    yield manager
+    manager.cleanup()
+
+
+@pytest.fixture
+def dashboard(handler):
+    """Flask test client for a dashboard over simulated sensors and the session DataHandler"""
+    from src.sensors import SensorManager
+    from src.web_dashboard import create_app
+    
+    # The sampler thread reads its own SensorManager, not the shared one
+    manager = SensorManager(SIM_SENSORS_CONFIG)
+    monitor = SimpleNamespace(
+        config={'web_dashboard': {'sample_interval': 0.05, 'max_streams': 1}},
+        sensor_manager=manager,
+        data_handler=handler
+    )
+    app = create_app(monitor)
+    yield app.test_client()
+    app.config['sampler'].stop()
+    manager.cleanup()
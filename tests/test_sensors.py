@@ -2,131 +2,382 @@
 Unit Tests for EdgePulse-Pi5
 """
 
+import json
+import time
+import numpy as np
 import pytest
-import sys
-from datetime import datetime
-sys.path.insert(0, '..')
+from datetime import datetime, timedelta
+from types import MappingProxyType, SimpleNamespace
 
-from src.sensors import SensorManager
-from src.analyzer import VitalSignsAnalyzer
-from src.alerts import AlertManager
-from src.data_handler import DataHandler
+# Fixed alert timestamp keeps the tests deterministic
+FIXED_TS = datetime(2024, 1, 1)
+
+# Read-only thresholds shared by every analyzer test (see the analyzer fixture)
+THRESHOLDS = MappingProxyType({
+    'heart_rate': MappingProxyType({'min': 60, 'max': 100, 'critical_min': 40, 'critical_max': 150}),
+    'spo2': MappingProxyType({'min': 95, 'critical_min': 90}),
+    'temperature': MappingProxyType({'min': 36.1, 'max': 37.8, 'critical_min': 35.0, 'critical_max': 39.0})
+})
 
 
 class TestSensorManager:
     """Test sensor management"""
     
-    def test_sensor_initialization(self):
+    def test_sensor_initialization(self, sim_sensor_manager):
         """Test sensor manager initialization"""
-        config = {
-            'max30102': {'red_led_current': 24, 'ir_led_current': 24},
-            'ds18b20': {'calibration_offset': 0.0},
-            'indicators': {}
-        }
-        
-        manager = SensorManager(config)
-        assert manager is not None
+        assert sim_sensor_manager is not None
+        assert sim_sensor_manager.max30102.simulation_mode
+        assert sim_sensor_manager.ds18b20.simulation_mode
     
-    def test_read_all(self):
+    def test_read_all(self, sim_sensor_manager):
         """Test reading all sensors"""
-        config = {
-            'max30102': {'red_led_current': 24, 'ir_led_current': 24},
-            'ds18b20': {'calibration_offset': 0.0},
-            'indicators': {}
-        }
+        readings = sim_sensor_manager.read_all()
         
-        manager = SensorManager(config)
-        readings = manager.read_all()
-        
-        # Should return data (simulated if hardware not available)
+        # Should return simulated data
         assert readings is not None
         assert 'heart_rate' in readings
         assert 'spo2' in readings
         assert 'temperature' in readings
+    
+    def test_read_all_without_led(self, sim_sensor_manager):
+        """Test that update_led=False leaves the status LED as it is"""
+        indicators = sim_sensor_manager.indicators
+        indicators.set_led('off')
+        
+        assert sim_sensor_manager.read_all(update_led=False) is not None
+        assert indicators._last_color == 'off'
+        
+        sim_sensor_manager.read_all()
+        assert indicators._last_color == 'green'
 
 
-class TestVitalSignsAnalyzer:
-    """Test vital signs analysis"""
+def _ppg_window(bpm, samples, noise=0.0, rate=100):
+    """Synthetic IR PPG window and its timestamps, with one maximum per beat"""
+    t = np.arange(samples) / rate
+    phase = 2 * np.pi * bpm / 60 * t
+    ir = 50000 + 1000 * (np.sin(phase) + 0.25 * np.sin(2 * phase + 0.8))
+    ir += np.random.default_rng(0).normal(0, noise, samples)
+    return ir, t
+
+
+class TestMAX30102:
+    """Test MAX30102 FIFO interrupt handling and heart rate detection"""
     
-    def test_normal_readings(self):
-        """Test that normal readings produce no alerts"""
-        thresholds = {
-            'heart_rate': {'min': 60, 'max': 100, 'critical_min': 40, 'critical_max': 150},
-            'spo2': {'min': 95, 'critical_min': 90},
-            'temperature': {'min': 36.1, 'max': 37.8, 'critical_min': 35.0, 'critical_max': 39.0}
-        }
+    @pytest.fixture(params=[False, True], ids=['numpy', 'numba'])
+    def sensor(self, request, monkeypatch):
+        """Simulated sensor with the NumPy or the Numba peak detector"""
+        from src import sensors
         
-        analyzer = VitalSignsAnalyzer(thresholds)
+        # Without Numba installed the kernel runs as plain Python, which
+        # still exercises its code path
+        monkeypatch.setattr(sensors, 'HAS_NUMBA', request.param)
+        return sensors.MAX30102Sensor({}, simulate=True)
+    
+    @pytest.fixture
+    def gpio(self, monkeypatch):
+        """Stand-in for RPi.GPIO that records the INT pin edge detection"""
+        from src import sensors
         
-        normal_readings = {
-            'heart_rate': 75,
-            'spo2': 98,
-            'temperature': 36.8,
-            'temperature_unit': 'C'
-        }
+        class FakeGPIO:
+            BCM = IN = PUD_UP = FALLING = 0
+            
+            def __init__(self):
+                self.detecting = set()
+            
+            def setmode(self, mode):
+                pass
+            
+            def setup(self, pin, direction, pull_up_down=None):
+                pass
+            
+            def add_event_detect(self, pin, edge, callback):
+                self.detecting.add(pin)
+            
+            def remove_event_detect(self, pin):
+                self.detecting.discard(pin)
         
-        alerts = analyzer.analyze(normal_readings)
-        assert len(alerts) == 0
+        fake = FakeGPIO()
+        monkeypatch.setattr(sensors, 'HAS_GPIO', True)
+        monkeypatch.setattr(sensors, 'GPIO', fake, raising=False)
+        return fake
     
-    def test_abnormal_heart_rate(self):
-        """Test that abnormal heart rate produces alerts"""
-        thresholds = {
-            'heart_rate': {'min': 60, 'max': 100, 'critical_min': 40, 'critical_max': 150},
-            'spo2': {'min': 95, 'critical_min': 90},
-            'temperature': {'min': 36.1, 'max': 37.8, 'critical_min': 35.0, 'critical_max': 39.0}
-        }
+    @staticmethod
+    def _interrupt_sensor(driver):
+        """MAX30102 on INT pin 4 with a fake driver, past the hardware setup"""
+        from src import sensors
         
-        analyzer = VitalSignsAnalyzer(thresholds)
+        sensor = sensors.MAX30102Sensor({'int_pin': 4}, simulate=True)
+        sensor.simulation_mode = False
+        sensor.sensor = driver
+        sensor._setup_fifo_interrupt()
+        return sensor
+    
+    class EmptyFIFO:
+        """Driver whose FIFO never has samples and can't enable the interrupt"""
         
-        abnormal_readings = {
-            'heart_rate': 45,
-            'spo2': 98,
-            'temperature': 36.8,
-            'temperature_unit': 'C'
-        }
+        def available(self):
+            return 0
+    
+    class EmptyFIFOWithInterrupt(EmptyFIFO):
+        def enable_afull(self):
+            pass
+    
+    def test_interrupt_needs_enable_afull(self, gpio):
+        """Test that a driver without enable_afull keeps polling"""
+        sensor = self._interrupt_sensor(self.EmptyFIFO())
         
-        alerts = analyzer.analyze(abnormal_readings)
-        assert len(alerts) > 0
-        assert alerts[0]['type'] == 'heart_rate'
+        assert not sensor.interrupt_mode
+        assert not gpio.detecting
     
-    def test_critical_spo2(self):
-        """Test that critical SpO2 produces critical alert"""
-        thresholds = {
-            'heart_rate': {'min': 60, 'max': 100, 'critical_min': 40, 'critical_max': 150},
-            'spo2': {'min': 95, 'critical_min': 90},
-            'temperature': {'min': 36.1, 'max': 37.8, 'critical_min': 35.0, 'critical_max': 39.0}
-        }
+    def test_stalled_interrupt_falls_back_to_polling(self, gpio, monkeypatch):
+        """Test that an interrupt that never fires is dropped for polling"""
+        from src import sensors
         
-        analyzer = VitalSignsAnalyzer(thresholds)
+        sensor = self._interrupt_sensor(self.EmptyFIFOWithInterrupt())
+        assert sensor.interrupt_mode
+        assert gpio.detecting == {4}
         
-        critical_readings = {
-            'heart_rate': 75,
-            'spo2': 88,
-            'temperature': 36.8,
-            'temperature_unit': 'C'
+        # More than one read window (1s) without a FIFO burst
+        sensor._interrupt_since -= 2
+        monkeypatch.setattr(sensors, 'time', SimpleNamespace(monotonic=time.monotonic, sleep=lambda s: None))
+        
+        assert sensor.read() is None
+        assert not sensor.interrupt_mode
+        assert not gpio.detecting
+    
+    @pytest.mark.parametrize("noise", [0.0, 30.0], ids=['clean', 'noisy'])
+    @pytest.mark.parametrize("bpm", [90, 120, 150, 180])
+    def test_heart_rate(self, sensor, bpm, noise):
+        """Test heart rate from a 3 second window at a known rate"""
+        ir, t = _ppg_window(bpm, 300, noise)
+        
+        assert sensor._calculate_heart_rate(ir, t) == pytest.approx(bpm, abs=3)
+    
+    @pytest.mark.parametrize("bpm,samples,expected", [
+        (30, 500, 30),     # Lower limit, 2.5 beats in 5 seconds
+        (250, 300, 250),   # Upper limit
+        (300, 300, None),  # Detected, but above the valid range
+    ], ids=['30bpm', '250bpm', '300bpm'])
+    def test_heart_rate_band_limits(self, sensor, bpm, samples, expected):
+        """Test heart rates at and beyond the 30-250 bpm limits"""
+        ir, t = _ppg_window(bpm, samples)
+        
+        result = sensor._calculate_heart_rate(ir, t)
+        assert result == (None if expected is None else pytest.approx(expected, abs=1))
+    
+    def test_peaks_flat_signal(self, sensor):
+        """Test that a flat signal has no peaks"""
+        assert sensor._detect_peaks_ms(np.full(100, 50000.0)).size == 0
+    
+    def test_peaks_single_pulse(self, sensor):
+        """Test that one pulse gives one peak at its maximum"""
+        pulse = 50000 + 1000 * np.exp(-((np.arange(100) - 50) / 8.0) ** 2)
+        
+        assert sensor._detect_peaks_ms(pulse).tolist() == [50]
+    
+    def test_heart_rate_short_window(self, sensor):
+        """Test that a window holding fewer than two peaks gives no heart rate"""
+        # 60 bpm over 100 samples at 100 Hz is a single beat
+        ir, t = _ppg_window(60, 100)
+        
+        assert sensor._calculate_heart_rate(ir, t) is None
+
+
+class TestDS18B20:
+    """Test DS18B20 start-up when the 1-Wire device isn't there"""
+    
+    @pytest.fixture
+    def sensors(self, monkeypatch):
+        """sensors module with the library present and no retry delay"""
+        from src import sensors
+        
+        monkeypatch.setattr(sensors, 'HAS_DS18B20', True)
+        monkeypatch.setattr(sensors, 'DS18B20_RETRY_INTERVAL', 0)
+        return sensors
+    
+    def test_missing_device_falls_back_to_simulation(self, sensors, monkeypatch):
+        """Test that reads give None while retrying, then simulated data"""
+        def no_sensor():
+            raise RuntimeError("No DS18B20 found")
+        
+        monkeypatch.setattr(sensors, 'W1ThermSensor', no_sensor, raising=False)
+        sensor = sensors.DS18B20Sensor({'init_retries': 3})
+        assert not sensor.simulation_mode
+        
+        # Second of the three attempts (the first ran in __init__)
+        assert sensor.read() is None
+        
+        # The last attempt fails too, so this read is already simulated
+        reading = sensor.read()
+        assert sensor.simulation_mode
+        assert reading['temperature_unit'] == 'C'
+        assert 30.0 <= reading['temperature'] <= 42.0
+    
+    def test_late_device_is_picked_up(self, sensors, monkeypatch):
+        """Test that a device appearing before the retries run out is used"""
+        class LateSensor:
+            id = 'test'
+            attempts = 0
+            
+            def __init__(self):
+                LateSensor.attempts += 1
+                if LateSensor.attempts == 1:
+                    raise RuntimeError("No DS18B20 found")
+            
+            def set_resolution(self, resolution, persist=False):
+                pass
+            
+            def get_temperature(self):
+                return 36.74
+        
+        monkeypatch.setattr(sensors, 'W1ThermSensor', LateSensor, raising=False)
+        sensor = sensors.DS18B20Sensor({'init_retries': 3})
+        
+        # 9-bit resolution reports in 0.5°C steps
+        assert sensor.read() == {'temperature': 36.5, 'temperature_unit': 'C'}
+        assert not sensor.simulation_mode
+
+
+class TestStatusIndicators:
+    """Test LED and buzzer indicators"""
+    
+    def test_beep_preemption(self):
+        """Test that a longer beep pattern takes over from the one playing"""
+        from src.sensors import StatusIndicators
+        
+        class RecordingPWM:
+            def __init__(self):
+                self.duty_cycles = []
+            
+            def ChangeDutyCycle(self, duty):
+                self.duty_cycles.append(duty)
+        
+        # Drive the buzzer thread against a PWM stand-in instead of GPIO
+        indicators = StatusIndicators({}, simulate=True)
+        indicators.simulation_mode = False
+        indicators._pwm = pwm = RecordingPWM()
+        
+        indicators.beep(duration=0.1, count=2)
+        warning = indicators._beep_thread
+        
+        # Fewer beeps don't interrupt; more beeps replace the warning pattern
+        indicators.beep(duration=0.01, count=1)
+        assert indicators._beep_thread is warning
+        indicators.beep(duration=0.01, count=3)
+        assert not warning.is_alive()
+        
+        indicators._beep_thread.join()
+        # The cut-short warning beep, then all three new ones
+        assert pwm.duty_cycles == [50, 0] + [50, 0] * 3
+
+
+class TestVitalSignsAnalyzer:
+    """Test vital signs analysis"""
+    
+    @pytest.mark.parametrize("readings,check", [
+        # Normal readings produce no alerts
+        (
+            {'heart_rate': 75, 'spo2': 98, 'temperature': 36.8, 'temperature_unit': 'C'},
+            lambda alerts: len(alerts) == 0
+        ),
+        # Abnormal heart rate produces a heart rate alert
+        (
+            {'heart_rate': 45, 'spo2': 98, 'temperature': 36.8, 'temperature_unit': 'C'},
+            lambda alerts: len(alerts) > 0 and alerts[0]['type'] == 'heart_rate'
+        ),
+        # Critical SpO2 produces a critical alert
+        (
+            {'heart_rate': 75, 'spo2': 88, 'temperature': 36.8, 'temperature_unit': 'C'},
+            lambda alerts: any(alert['severity'] == 'critical' for alert in alerts)
+        ),
+    ], ids=['normal_readings', 'abnormal_heart_rate', 'critical_spo2'])
+    def test_analyze(self, analyzer, readings, check):
+        """Test the alerts produced for a set of readings"""
+        assert check(analyzer.analyze(readings))
+    
+    @pytest.fixture(params=[False, True], ids=['python', 'kernel'])
+    def classifier(self, request, monkeypatch):
+        """Run with the plain comparisons (no Numba) or the _check_vitals kernel"""
+        from src import analyzer as analyzer_module
+        
+        monkeypatch.setattr(analyzer_module, 'HAS_NUMBA', request.param)
+    
+    @pytest.mark.parametrize("readings,expected", [
+        ({'heart_rate': 60, 'spo2': 95, 'temperature': 37.8}, []),
+        ({'heart_rate': 40}, [('heart_rate', 'warning')]),
+        ({'heart_rate': 39}, [('heart_rate', 'critical')]),
+        ({'heart_rate': 150}, [('heart_rate', 'warning')]),
+        ({'heart_rate': 151}, [('heart_rate', 'critical')]),
+        ({'spo2': 90}, [('spo2', 'warning')]),
+        ({'spo2': 89}, [('spo2', 'critical')]),
+        ({'temperature': 38.5}, [('temperature', 'critical')]),
+        ({'temperature': 101.0, 'temperature_unit': 'F'}, [('temperature', 'warning')]),
+    ])
+    def test_threshold_bands(self, analyzer, classifier, readings, expected):
+        """Test the severity at and around each limit"""
+        alerts = analyzer.analyze(readings)
+        assert [(alert['type'], alert['severity']) for alert in alerts] == expected
+    
+    def test_heart_rate_trend(self, analyzer, classifier):
+        """Test that a rise of more than 20 bpm between windows raises a trend alert"""
+        for hr in [70] * 5 + [95] * 4:
+            assert analyzer.analyze({'heart_rate': hr}) == []
+        
+        alerts = analyzer.analyze({'heart_rate': 95})
+        assert [alert['type'] for alert in alerts] == ['heart_rate_trend']
+    
+    def test_statistics(self, analyzer):
+        """Test statistics over the last 60 readings once the history wraps"""
+        for hr in range(30, 100):
+            analyzer.analyze({'heart_rate': hr, 'spo2': 98})
+        
+        stats = analyzer.get_statistics()
+        assert stats['heart_rate'] == {
+            'current': 99, 'average': 69.5, 'min': 40, 'max': 99, 'count': 60
         }
+        assert stats['spo2']['average'] == 98
+        assert 'temperature' not in stats
+    
+    def test_limits_copy_and_pickle(self):
+        """Test that frozen Limits survive copy, deepcopy and pickle"""
+        import copy
+        import pickle
+        from src.analyzer import Limits
         
-        alerts = analyzer.analyze(critical_readings)
-        assert len(alerts) > 0
-        assert any(alert['severity'] == 'critical' for alert in alerts)
+        limits = Limits.from_config(THRESHOLDS['spo2'])
+        
+        for clone in (copy.copy(limits), copy.deepcopy(limits),
+                      pickle.loads(pickle.dumps(limits))):
+            assert clone == limits
+            assert clone.max is None
 
 
 class TestDataHandler:
     """Test data handling and storage"""
     
-    def test_database_creation(self, tmp_path):
+    def test_database_creation(self, handler):
         """Test database creation"""
-        db_path = tmp_path / "test.db"
-        handler = DataHandler(str(db_path))
+        tables = {row[0] for row in handler.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )}
+        
+        assert {'readings', 'alerts'} <= tables
+    
+    def test_pragmas_applied(self, tmp_path):
+        """Test that the connection is tuned for frequent small writes"""
+        from src.data_handler import DataHandler
+        
+        handler = DataHandler(str(tmp_path / "test.db"))
+        
+        assert handler.conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert handler.conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert handler.conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert handler.conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
         
-        assert db_path.exists()
         handler.close()
     
-    def test_save_reading(self, tmp_path):
+    def test_save_reading(self, handler):
         """Test saving readings"""
-        db_path = tmp_path / "test.db"
-        handler = DataHandler(str(db_path))
-        
         reading = {
             'heart_rate': 75,
             'spo2': 98,
@@ -141,21 +392,138 @@ class TestDataHandler:
         readings = handler.get_readings(limit=1)
         assert len(readings) == 1
         assert readings[0]['heart_rate'] == 75
+    
+    def test_save_readings_batch(self, handler):
+        """Test saving a batch of readings in one transaction"""
+        reading = {
+            'heart_rate': 75,
+            'spo2': 98,
+            'temperature': 36.8,
+            'temperature_unit': 'C'
+        }
+        
+        result = handler.save_readings([reading] * 10000)
+        assert result is True
+        
+        readings = handler.get_readings(limit=None)
+        assert len(readings) == 10000
+        assert all(r['heart_rate'] == 75 for r in readings)
+    
+    def test_date_window(self, handler, local_tz):
+        """Test that readings are stored on the clock that date filters use"""
+        now = time.time()
+        handler.save_readings([
+            {'heart_rate': 70, 'spo2': 97, 'temperature': 36.7, 'timestamp': now - 7200},
+            {'heart_rate': 72, 'spo2': 98, 'temperature': 36.8, 'timestamp': now}
+        ])
+        
+        start_date = datetime.now() - timedelta(hours=1)
+        readings = handler.get_readings(start_date=start_date, limit=None)
+        assert [r['heart_rate'] for r in readings] == [72]
+        
+        assert handler.cleanup_old_data(start_date) == 1
+        assert len(handler.get_readings(limit=None)) == 1
+    
+    @pytest.mark.parametrize("start, end, expected", [
+        (None, None, [74, 72, 70]),
+        (-25, None, [74, 72]),
+        (None, -15, [72, 70]),
+        (-25, -15, [72])
+    ])
+    def test_date_filters(self, handler, start, end, expected):
+        """Test every start/end filter combination of the precomputed queries"""
+        now = int(time.time())
+        handler.save_readings([
+            {'heart_rate': 70, 'spo2': 97, 'temperature': 36.7, 'timestamp': now - 30},
+            {'heart_rate': 72, 'spo2': 98, 'temperature': 36.8, 'timestamp': now - 20},
+            {'heart_rate': 74, 'spo2': 98, 'temperature': 36.9, 'timestamp': now - 10}
+        ])
+        
+        start_date = datetime.fromtimestamp(now + start) if start else None
+        end_date = datetime.fromtimestamp(now + end) if end else None
+        
+        readings = handler.get_readings(start_date, end_date, limit=None)
+        assert [r['heart_rate'] for r in readings] == expected
+        
+        records = handler.get_readings_array(start_date, end_date, limit=None)
+        assert records['heart_rate'].tolist() == expected
+        
+        stats = handler.get_statistics(start_date, end_date)
+        assert stats['count'] == len(expected)
+    
+    def test_get_recent_stats(self, handler):
+        """Test statistics over only the most recent readings"""
+        now = int(time.time())
+        handler.save_readings([
+            {'heart_rate': hr, 'spo2': 98, 'temperature': 36.8, 'timestamp': now - 10 + i}
+            for i, hr in enumerate([60, 70, 80, 90, 100])
+        ])
+        
+        stats = handler.get_recent_stats(2)
+        assert stats['count'] == 2
+        assert stats['avg_hr'] == 95
+        assert (stats['min_hr'], stats['max_hr']) == (90, 100)
+        
+        assert handler.get_recent_stats(10)['count'] == 5
+    
+    def test_get_readings_array(self, handler, local_tz):
+        """Test readings loaded as a NumPy record array"""
+        from src.data_handler import READINGS_ARRAY_DTYPE
+        
+        now = int(time.time())
+        handler.save_readings([
+            {'heart_rate': 70, 'spo2': 97, 'temperature': 36.7, 'timestamp': now - 2},
+            {'heart_rate': 72, 'spo2': None, 'temperature': 36.8, 'timestamp': now - 1},
+            {'heart_rate': 74, 'spo2': 98, 'temperature': 36.9, 'timestamp': now}
+        ])
+        
+        records = handler.get_readings_array(limit=2)
+        assert records.dtype == READINGS_ARRAY_DTYPE
+        
+        # Newest first; NULL comes back as NaN
+        assert records['timestamp'].astype(np.int64).tolist() == [now, now - 1]
+        assert records['heart_rate'].tolist() == [74, 72]
+        assert np.isnan(records['spo2'][1])
+        
+        assert handler.get_readings_array(limit=None).size == 3
+    
+    def test_cleanup_old_data(self, tmp_path):
+        """Test that old rows are deleted, counted and their pages reclaimed"""
+        from src.data_handler import DataHandler
+        
+        handler = DataHandler(str(tmp_path / "test.db"))
+        now = time.time()
+        old = now - 10 * 86400
+        
+        reading = {'heart_rate': 75, 'spo2': 98, 'temperature': 36.8}
+        handler.save_readings([{**reading, 'timestamp': old}] * 2000 + [{**reading, 'timestamp': now}])
+        handler.save_alert({
+            'type': 'heart_rate',
+            'severity': 'warning',
+            'message': 'Old alert',
+            'timestamp': datetime.fromtimestamp(old)
+        })
+        
+        deleted = handler.cleanup_old_data(datetime.now() - timedelta(days=1))
+        assert deleted == 2001
+        assert len(handler.get_readings(limit=None)) == 1
+        assert handler.get_alerts() == []
+        
+        # Incremental vacuum returned the freed pages to the filesystem
+        assert handler.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2  # INCREMENTAL
+        assert handler.conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
         
         handler.close()
     
-    def test_save_alert(self, tmp_path):
+    def test_save_alert(self, handler):
         """Test saving alerts"""
-        db_path = tmp_path / "test.db"
-        handler = DataHandler(str(db_path))
-        
         alert = {
             'type': 'heart_rate',
             'severity': 'warning',
             'message': 'Test alert',
             'value': 120,
             'threshold': 100,
-            'timestamp': datetime.now()
+            'timestamp': FIXED_TS
         }
         
         result = handler.save_alert(alert)
@@ -165,8 +533,6 @@ class TestDataHandler:
         alerts = handler.get_alerts(limit=1)
         assert len(alerts) == 1
         assert alerts[0]['severity'] == 'warning'
-        
-        handler.close()
 
 
 class TestAlertManager:
@@ -174,6 +540,8 @@ class TestAlertManager:
     
     def test_alert_initialization(self):
         """Test alert manager initialization"""
+        from src.alerts import AlertManager
+        
         config = {
             'email': {'enabled': False},
             'sms': {'enabled': False},
@@ -185,6 +553,8 @@ class TestAlertManager:
     
     def test_alert_history(self):
         """Test alert history tracking"""
+        from src.alerts import AlertManager
+        
         config = {
             'email': {'enabled': False},
             'sms': {'enabled': False},
@@ -197,13 +567,336 @@ class TestAlertManager:
             'type': 'heart_rate',
             'severity': 'warning',
             'message': 'Test alert',
-            'timestamp': datetime.now()
+            'timestamp': FIXED_TS
         }
         
         manager.send_alert(alert)
         
         history = manager.get_alert_history()
         assert len(history) == 1
+    
+    def test_alert_cooldown(self):
+        """Test that repeats within the cooldown are suppressed and counted"""
+        from src.alerts import AlertManager
+        from src.sensors import StatusIndicators
+        
+        config = {
+            'email': {'enabled': False},
+            'sms': {'enabled': False},
+            'local': {'buzzer_enabled': False, 'led_enabled': False},
+            'cooldown': 0.2
+        }
+        
+        # Simulated indicators give the local channel something to send to
+        manager = AlertManager(config, StatusIndicators({}, simulate=True))
+        
+        alert = {
+            'type': 'heart_rate',
+            'severity': 'warning',
+            'message': 'Test alert',
+            'timestamp': FIXED_TS
+        }
+        
+        assert manager.send_alert(alert)['local'] is True
+        assert manager.send_alert(alert) == {'suppressed': True}
+        assert manager.send_alert(alert) == {'suppressed': True}
+        assert len(manager.get_alert_history()) == 1
+        
+        # The next alert after the cooldown reports the repeats it replaced
+        time.sleep(0.25)
+        assert manager.send_alert(alert)['local'] is True
+        
+        history = manager.get_alert_history()
+        assert len(history) == 2
+        assert history[-1]['message'] == 'Test alert (2 similar alert(s) suppressed)'
+        
+        manager.close()
+
+
+class TestEmailAlert:
+    """Test the cached SMTP session"""
+    
+    ALERT = {
+        'type': 'heart_rate',
+        'severity': 'warning',
+        'message': 'Test alert',
+        'timestamp': FIXED_TS
+    }
+    
+    @pytest.fixture
+    def smtp(self, monkeypatch):
+        """Fake smtplib.SMTP/SMTP_SSL; returns the list of connections opened"""
+        import smtplib
+        from src import alerts
+        
+        opened = []
+        
+        class FakeSMTP:
+            ssl = False
+            
+            def __init__(self, host, port):
+                self.address = (host, port)
+                self.calls = []
+                self.noop_fails = False
+                opened.append(self)
+            
+            def starttls(self):
+                self.calls.append('starttls')
+            
+            def login(self, username, password):
+                self.calls.append('login')
+            
+            def noop(self):
+                self.calls.append('noop')
+                if self.noop_fails:
+                    raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+            
+            def send_message(self, msg):
+                self.calls.append('send')
+            
+            def quit(self):
+                self.calls.append('quit')
+        
+        class FakeSMTPSSL(FakeSMTP):
+            ssl = True
+        
+        monkeypatch.setattr(alerts.smtplib, 'SMTP', FakeSMTP)
+        monkeypatch.setattr(alerts.smtplib, 'SMTP_SSL', FakeSMTPSSL)
+        return opened
+    
+    @staticmethod
+    def _email(**config):
+        from src.alerts import EmailAlert
+        
+        return EmailAlert({
+            'enabled': True,
+            'smtp_server': 'smtp.example.com',
+            'username': 'user',
+            'password': 'secret',
+            'recipient': 'doctor@example.com',
+            **config
+        })
+    
+    def test_connection_reuse(self, smtp):
+        """Test that one logged-in session carries every alert"""
+        email = self._email()
+        
+        assert all(email.send(self.ALERT) for _ in range(3))
+        assert len(smtp) == 1
+        assert smtp[0].calls == ['starttls', 'login', 'send'] + ['noop', 'send'] * 2
+        
+        email.close()
+        assert smtp[0].calls[-1] == 'quit'
+    
+    def test_reconnect_after_failed_noop(self, smtp):
+        """Test that a dropped session is replaced before sending"""
+        email = self._email()
+        assert email.send(self.ALERT)
+        
+        smtp[0].noop_fails = True
+        assert email.send(self.ALERT)
+        
+        assert len(smtp) == 2
+        assert smtp[0].calls == ['starttls', 'login', 'send', 'noop']
+        assert smtp[1].calls == ['starttls', 'login', 'send']
+        email.close()
+    
+    @pytest.mark.parametrize("config, ssl", [
+        ({'smtp_port': 465}, True),
+        ({'smtp_port': 587}, False),
+        ({'smtp_port': 2465, 'use_ssl': True}, True),
+        ({'smtp_port': 465, 'use_ssl': False}, False)
+    ])
+    def test_use_ssl(self, smtp, config, ssl):
+        """Test implicit TLS from port 465 or use_ssl, with no STARTTLS upgrade"""
+        email = self._email(**config)
+        assert email.send(self.ALERT)
+        
+        assert smtp[0].ssl is ssl
+        assert smtp[0].address == ('smtp.example.com', config['smtp_port'])
+        assert ('starttls' in smtp[0].calls) is not ssl
+        email.close()
+
+
+class TestWebDashboard:
+    """Test the dashboard API"""
+    
+    def test_stream(self, dashboard):
+        """Test that /api/stream pushes readings and limits open streams"""
+        sampler = dashboard.application.config['sampler']
+        
+        response = dashboard.get('/api/stream', buffered=False)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        
+        event = next(response.response)
+        assert event.startswith(b'data: ')
+        assert 'heart_rate' in json.loads(event[len(b'data: '):])
+        
+        # A stream that isn't being read must not hold up sampling
+        seq = sampler.seq
+        time.sleep(0.3)
+        assert sampler.seq > seq
+        
+        # max_streams is 1 in the fixture
+        assert dashboard.get('/api/stream').status_code == 503
+        
+        response.close()
+        assert sampler.subscribers == 0
+    
+    def test_cached_response_etag(self, dashboard, handler):
+        """Test that cached responses carry an ETag and revalidate with 304"""
+        alert = {
+            'type': 'heart_rate',
+            'severity': 'warning',
+            'message': 'Test alert',
+            'timestamp': datetime.now()
+        }
+        handler.save_alert(alert)
+        
+        response = dashboard.get('/api/alerts')
+        assert response.status_code == 200
+        assert len(response.get_json()['data']) == 1
+        etag = response.headers['ETag']
+        
+        response = dashboard.get('/api/alerts', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+        
+        # Within the TTL the cached body is served without querying again
+        handler.save_alert(alert)
+        response = dashboard.get('/api/alerts')
+        assert response.headers['ETag'] == etag
+        assert len(response.get_json()['data']) == 1
+    
+    @pytest.mark.parametrize("accept_encoding, gzipped", [
+        ('gzip, deflate', True),
+        ('identity', False)
+    ])
+    def test_index_encoding(self, dashboard, accept_encoding, gzipped):
+        """Test the pre-gzipped index page, its identity fallback and 304s"""
+        import gzip
+        from src.web_dashboard import HTML_TEMPLATE
+        
+        headers = {'Accept-Encoding': accept_encoding}
+        response = dashboard.get('/', headers=headers)
+        assert response.status_code == 200
+        assert response.headers.get('Content-Encoding') == ('gzip' if gzipped else None)
+        assert 'Accept-Encoding' in response.headers['Vary']
+        
+        body = gzip.decompress(response.data) if gzipped else response.data
+        assert body.decode('utf-8') == HTML_TEMPLATE
+        
+        # Each encoding has its own ETag, and revalidates with an empty 304
+        etag = response.headers['ETag']
+        assert etag.endswith('-gzip"') is gzipped
+        
+        response = dashboard.get('/', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+        assert 'Content-Encoding' not in response.headers
+        assert 'Accept-Encoding' in response.headers['Vary']
+    
+    def test_history_soa(self, dashboard, handler, local_tz):
+        """Test column-oriented history, with missing values as null"""
+        now = int(time.time())
+        handler.save_readings([
+            {'heart_rate': 68, 'spo2': 98, 'temperature': 36.6, 'timestamp': now - 3660},
+            {'heart_rate': 70, 'spo2': 97, 'temperature': 36.7, 'timestamp': now - 3540},
+            {'heart_rate': None, 'spo2': 96, 'temperature': 36.9, 'timestamp': now}
+        ])
+        
+        response = dashboard.get('/api/history?format=soa&hours=1')
+        assert response.status_code == 200
+        
+        # Newest first, like the row format; the reading just outside the
+        # window is left out and 't' is Unix seconds whatever the local zone
+        assert response.get_json()['data'] == {
+            't': [now, now - 3540],
+            'hr': [None, 70],
+            'spo2': [96, 97],
+            'temp': [36.9, 36.7]
+        }
+
+
+
+class TestEdgePulseMonitor:
+    """Test the monitor's background work queue"""
+    
+    @pytest.fixture
+    def monitor(self, main_module, handler):
+        """Monitor with the session DataHandler and a one-minute alert cooldown"""
+        from src.alerts import AlertManager
+        from src.sensors import StatusIndicators
+        
+        config = {
+            'email': {'enabled': False},
+            'sms': {'enabled': False},
+            'local': {'buzzer_enabled': False, 'led_enabled': False},
+            'cooldown': 60
+        }
+        
+        # Only the parts the worker uses; __init__ would read config.yaml
+        monitor = object.__new__(main_module.EdgePulseMonitor)
+        monitor._work_q = main_module.queue.Queue(maxsize=3)
+        monitor.data_handler = handler
+        monitor.alert_manager = AlertManager(config, StatusIndicators({}, simulate=True))
+        yield monitor
+        monitor.alert_manager.close()
+    
+    def test_submit_drops_oldest(self, monitor):
+        """Test that a full queue drops its oldest item instead of blocking"""
+        for i in range(4):
+            monitor._submit('reading', i)
+        
+        assert [monitor._work_q.get_nowait() for _ in range(3)] == [
+            ('reading', 1), ('reading', 2), ('reading', 3)
+        ]
+        assert monitor._work_q.empty()
+    
+    def test_worker_stores_suppressed_alerts(self, monitor, handler):
+        """Test that alerts throttled by the cooldown are still stored"""
+        monitor.analyzer = SimpleNamespace(analyze=lambda reading: [{
+            'type': 'heart_rate',
+            'severity': 'warning',
+            'message': 'Test alert',
+            'timestamp': datetime.now()
+        }])
+        
+        reading = {'heart_rate': 130, 'spo2': 98, 'temperature': 36.8}
+        monitor._submit('reading', reading)
+        monitor._submit('reading', reading)
+        monitor._work_q.put(None)
+        monitor._worker_loop()
+        
+        # One notification, two rows in the audit log
+        assert len(monitor.alert_manager.get_alert_history()) == 1
+        assert len(handler.get_alerts()) == 2
+        assert len(handler.get_readings(limit=None)) == 2
+    
+    def test_config_cache(self, monitor, main_module, tmp_path):
+        """Test that parsed configs are reused until the file's mtime or size changes"""
+        import os
+        
+        path = tmp_path / "config.yaml"
+        path.write_text("database:\n  batch_size: 32\n")
+        st = os.stat(path)
+        
+        # Callers get their own copy and can't change the cached config
+        config = monitor.load_config(str(path))
+        config['database']['batch_size'] = 1
+        assert monitor.load_config(str(path)) == {'database': {'batch_size': 32}}
+        assert [key[0] for key in main_module._CONFIG_CACHE].count(str(path)) == 1
+        
+        # Same size, newer mtime
+        path.write_text("database:\n  batch_size: 64\n")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert monitor.load_config(str(path))['database']['batch_size'] == 64
+        
+        # Same mtime, different size
+        path.write_text("database:\n  batch_size: 128\n")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert monitor.load_config(str(path))['database']['batch_size'] == 128
 
 
 if __name__ == '__main__':